@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+from functools import partial
 from typing import Any
 import voluptuous as vol
 
@@ -22,28 +24,38 @@ from .const import (
     CONF_GATEWAY_HOST,
     CONF_GATEWAY_PORT,
     CONF_CONNECTION_TYPE,
+    CONF_THREADED_WRITER,
+    CONF_READ_BUFFER_SIZE,
     CONN_TYPE_SERIAL,
     CONN_TYPE_TCP,
     CONN_TYPE_DEMO,
     SERVICE_DISCOVERY_BUS1,
     SERVICE_DISCOVERY_BUS2,
     SERVICE_DISCOVERY_ALL,
+    SERVICE_DISCOVERY_BATCH,
     SERVICE_SET_CHANNEL_CONFIG,
+    SERVICE_SET_CHANNEL_CONFIG_BATCH,
     SERVICE_SET_DEVICE_NAME,
     ATTR_BUS_ID,
     ATTR_ADDRESS,
     ATTR_CHANNEL,
+    ATTR_CHANNEL_TYPE,
     ATTR_DEVICE_CLASS,
     ATTR_POLARITY,
     ATTR_DEVICE_NAME,
+    ATTR_CHANNELS,
     DEVICE_CLASS_INPUT_MAP,
     DEVICE_CLASS_OUTPUT_MAP,
     POLARITY_NO,
     POLARITY_NC,
     DEFAULT_BAUDRATE,
-    signal_device_name_updated,  # <-- NOWY IMPORT
+    DEFAULT_THREADED_WRITER,
+    DEFAULT_READ_BUFFER_SIZE,
+    signal_config_updated,
+    signal_device_name_updated,
 )
-from .hub import VelolinkHub, VelolinkBusConfig
+from .hub import VelolinkHub
+from .transport import VelolinkBusConfig
 from .storage import VelolinkStorage
 
 _LOGGER = logging.getLogger(__name__)
@@ -56,19 +68,36 @@ PLATFORMS: list[Platform] = [
     Platform.BUTTON,
 ]
 
+_ALLOWED_DEVICE_CLASSES = frozenset(DEVICE_CLASS_INPUT_MAP) | frozenset(
+    DEVICE_CLASS_OUTPUT_MAP
+)
+
 # Service schemas
 SERVICE_SET_CHANNEL_CONFIG_SCHEMA = vol.Schema(
     {
         vol.Required(ATTR_BUS_ID): cv.string,
         vol.Required(ATTR_ADDRESS): cv.positive_int,
         vol.Required(ATTR_CHANNEL): cv.positive_int,
-        vol.Optional(ATTR_DEVICE_CLASS): vol.In(
-            list(DEVICE_CLASS_INPUT_MAP.keys()) + list(DEVICE_CLASS_OUTPUT_MAP.keys())
-        ),
+        vol.Optional(ATTR_CHANNEL_TYPE): vol.In(["in", "out"]),
+        vol.Optional(ATTR_DEVICE_CLASS): vol.In(_ALLOWED_DEVICE_CLASSES),
         vol.Optional(ATTR_POLARITY): vol.In([POLARITY_NO, POLARITY_NC]),
     }
 )
 
+SERVICE_SET_CHANNEL_CONFIG_BATCH_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CHANNELS): vol.All(
+            cv.ensure_list, [SERVICE_SET_CHANNEL_CONFIG_SCHEMA]
+        ),
+    }
+)
+
+SERVICE_DISCOVERY_BATCH_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_BUS_ID): vol.All(cv.ensure_list, [cv.string]),
+    }
+)
+
 SERVICE_SET_DEVICE_NAME_SCHEMA = vol.Schema(
     {
         vol.Required(ATTR_BUS_ID): cv.string,
@@ -78,6 +107,145 @@ SERVICE_SET_DEVICE_NAME_SCHEMA = vol.Schema(
 )
 
 
+def _loaded_entries(
+    hass: HomeAssistant, bus_id: str | None = None
+) -> list[tuple[str, VelolinkHub, VelolinkStorage]]:
+    """Return (entry_id, hub, storage) for loaded entries, optionally by bus."""
+    data = hass.data.get(DOMAIN, {})
+    return [
+        (entry_id, hub, data[f"{entry_id}_storage"])
+        for entry_id, hub in list(data.items())
+        if isinstance(hub, VelolinkHub) and (bus_id is None or hub.has_bus(bus_id))
+    ]
+
+
+async def _handle_discovery_bus(
+    hass: HomeAssistant, bus_id: str, _call: ServiceCall
+) -> None:
+    """Handle discovery for a single bus."""
+    for _entry_id, hub, _storage in _loaded_entries(hass, bus_id):
+        await hub.async_discovery_bus(bus_id)
+
+
+async def _handle_discovery_all(hass: HomeAssistant, _call: ServiceCall) -> None:
+    """Handle discovery for all buses."""
+    await asyncio.gather(
+        *(hub.async_discovery_all() for _id, hub, _storage in _loaded_entries(hass))
+    )
+
+
+async def _handle_discovery_batch(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Handle discovery for a list of buses, scanning them concurrently."""
+    await asyncio.gather(
+        *(
+            hub.async_discovery_bus(bus_id)
+            for bus_id in dict.fromkeys(call.data[ATTR_BUS_ID])
+            for _entry_id, hub, _storage in _loaded_entries(hass, bus_id)
+        )
+    )
+
+
+async def _async_set_channel_config(
+    hass: HomeAssistant, data: dict[str, Any], dispatch: bool = True
+) -> list[str]:
+    """Apply one validated channel config update, return the updated entry ids."""
+    bus_id = data[ATTR_BUS_ID]
+    addr = data[ATTR_ADDRESS]
+    ch = data[ATTR_CHANNEL]
+    device_class = data.get(ATTR_DEVICE_CLASS)
+    polarity = data.get(ATTR_POLARITY)
+
+    entry_ids = []
+    for entry_id, hub, storage in _loaded_entries(hass, bus_id):
+        # Explicit type wins, otherwise it follows the node kind (inputs if unknown)
+        ch_type = data.get(ATTR_CHANNEL_TYPE) or hub.get_channel_type(bus_id, addr)
+        await storage.async_set_channel_config(
+            bus_id,
+            addr,
+            ch_type or "in",
+            ch,
+            device_class,
+            polarity,
+            entry_id if dispatch else None,
+        )
+        entry_ids.append(entry_id)
+    return entry_ids
+
+
+async def _handle_set_channel_config(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Handle set channel config service."""
+    await _async_set_channel_config(hass, call.data)
+
+
+async def _handle_set_channel_config_batch(
+    hass: HomeAssistant, call: ServiceCall
+) -> None:
+    """Handle set channel config for many channels in one service call."""
+    changed: dict[tuple[str, str, int], list[int]] = {}
+    for update in call.data[ATTR_CHANNELS]:
+        for entry_id in await _async_set_channel_config(hass, update, dispatch=False):
+            key = (entry_id, update[ATTR_BUS_ID], update[ATTR_ADDRESS])
+            changed.setdefault(key, []).append(update[ATTR_CHANNEL])
+
+    # One signal per device, carrying all of its changed channels
+    for (entry_id, bus_id, addr), channels in changed.items():
+        async_dispatcher_send(
+            hass, signal_config_updated(entry_id, bus_id, addr), channels
+        )
+
+
+async def _handle_set_device_name(hass: HomeAssistant, call: ServiceCall) -> None:
+    """Handle set device name service."""
+    bus_id = call.data[ATTR_BUS_ID]
+    addr = call.data[ATTR_ADDRESS]
+    name = call.data[ATTR_DEVICE_NAME]
+
+    for entry_id, _hub, storage in _loaded_entries(hass, bus_id):
+        await storage.async_set_device_name(bus_id, addr, name)
+        async_dispatcher_send(
+            hass,
+            signal_device_name_updated(entry_id),
+            {"bus_id": bus_id, "address": addr},
+        )
+
+
+def _async_register_services(hass: HomeAssistant) -> None:
+    """Register domain services."""
+    hass.services.async_register(
+        DOMAIN, SERVICE_DISCOVERY_BUS1, partial(_handle_discovery_bus, hass, "bus1")
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_DISCOVERY_BUS2, partial(_handle_discovery_bus, hass, "bus2")
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_DISCOVERY_ALL, partial(_handle_discovery_all, hass)
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_DISCOVERY_BATCH,
+        partial(_handle_discovery_batch, hass),
+        schema=SERVICE_DISCOVERY_BATCH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_CHANNEL_CONFIG,
+        partial(_handle_set_channel_config, hass),
+        schema=SERVICE_SET_CHANNEL_CONFIG_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_CHANNEL_CONFIG_BATCH,
+        partial(_handle_set_channel_config_batch, hass),
+        schema=SERVICE_SET_CHANNEL_CONFIG_BATCH_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SET_DEVICE_NAME,
+        partial(_handle_set_device_name, hass),
+        schema=SERVICE_SET_DEVICE_NAME_SCHEMA,
+    )
+
+
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Velolink from a config entry."""
     try:
@@ -91,6 +259,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             port2 = entry.data.get(CONF_PORT2)
             baudrate = entry.data.get(CONF_BAUDRATE, DEFAULT_BAUDRATE)
             rts_toggle = entry.data.get(CONF_RTS_TOGGLE, False)
+            threaded_writer = entry.data.get(
+                CONF_THREADED_WRITER, DEFAULT_THREADED_WRITER
+            )
 
             if port1:
                 buses["bus1"] = VelolinkBusConfig(
@@ -99,6 +270,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                     rts_toggle=rts_toggle,
                     name="Rozdzielnica",
                     transport="serial",
+                    threaded_writer=threaded_writer,
                 )
 
             if port2:
@@ -108,24 +280,30 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
                     rts_toggle=rts_toggle,
                     name="Dom",
                     transport="serial",
+                    threaded_writer=threaded_writer,
                 )
 
         elif connection_type == CONN_TYPE_TCP:
             # TCP connection (VeloGateway)
             host = entry.data.get(CONF_GATEWAY_HOST)
             port = entry.data.get(CONF_GATEWAY_PORT, 5485)
+            read_buffer_size = entry.data.get(
+                CONF_READ_BUFFER_SIZE, DEFAULT_READ_BUFFER_SIZE
+            )
 
             buses["bus1"] = VelolinkBusConfig(
                 host=host,
                 tcp_port=port,
                 name="VeloGateway Bus1",
                 transport="tcp",
+                read_buffer_size=read_buffer_size,
             )
             buses["bus2"] = VelolinkBusConfig(
                 host=host,
                 tcp_port=port,
                 name="VeloGateway Bus2",
                 transport="tcp",
+                read_buffer_size=read_buffer_size,
             )
 
         elif connection_type == CONN_TYPE_DEMO:
@@ -143,15 +321,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
             _LOGGER.error("No buses configured for Velolink")
             return False
 
-        # Initialize storage
         storage = VelolinkStorage(hass)
-        await storage.async_load()
-
-        # Initialize hub
         hub = VelolinkHub(hass, entry.entry_id, buses)
 
+        # Storage load is independent of transport bring-up, overlap them
         scan_on_startup = entry.data.get(CONF_SCAN_ON_STARTUP, True)
-        await hub.async_start(scan_on_startup=scan_on_startup)
+        await asyncio.gather(
+            storage.async_load(),
+            hub.async_start(scan_on_startup=scan_on_startup),
+        )
 
         hass.data.setdefault(DOMAIN, {})
         hass.data[DOMAIN][entry.entry_id] = hub
@@ -160,77 +338,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
         # Setup platforms
         await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
 
-        # Register services
-        async def handle_discovery_bus1(_call: ServiceCall) -> None:
-            """Handle discovery for bus1."""
-            await hub.async_discovery_bus("bus1")
-
-        async def handle_discovery_bus2(_call: ServiceCall) -> None:
-            """Handle discovery for bus2."""
-            await hub.async_discovery_bus("bus2")
-
-        async def handle_discovery_all(_call: ServiceCall) -> None:
-            """Handle discovery for all buses."""
-            await hub.async_discovery_all()
-
-        async def handle_set_channel_config(call: ServiceCall) -> None:
-            """Handle set channel config service."""
-            bus_id = call.data[ATTR_BUS_ID]
-            addr = call.data[ATTR_ADDRESS]
-            ch = call.data[ATTR_CHANNEL]
-            device_class = call.data.get(ATTR_DEVICE_CLASS)
-            polarity = call.data.get(ATTR_POLARITY)
-
-            # Determine channel type (simplified)
-            ch_type = "in"
-
-            await storage.async_set_channel_config(
-                bus_id, addr, ch_type, ch, device_class, polarity
-            )
-
-            # Fire event to update entities
-            hass.bus.async_fire(
-                f"{DOMAIN}_config_updated",
-                {"bus_id": bus_id, "address": addr, "channel": ch},
-            )
-
-        async def handle_set_device_name(call: ServiceCall) -> None:
-            """Handle set device name service."""
-            bus_id = call.data[ATTR_BUS_ID]
-            addr = call.data[ATTR_ADDRESS]
-            name = call.data[ATTR_DEVICE_NAME]
-
-            await storage.async_set_device_name(bus_id, addr, name)
-
-            # <-- FIX: Wyślij sygnał o aktualizacji nazwy -->
-            async_dispatcher_send(
-                hass,
-                signal_device_name_updated(entry.entry_id),
-                {"bus_id": bus_id, "address": addr},
-            )
-
-        # Register all services
-        hass.services.async_register(
-            DOMAIN, SERVICE_DISCOVERY_BUS1, handle_discovery_bus1
-        )
-        hass.services.async_register(
-            DOMAIN, SERVICE_DISCOVERY_BUS2, handle_discovery_bus2
-        )
-        hass.services.async_register(
-            DOMAIN, SERVICE_DISCOVERY_ALL, handle_discovery_all
-        )
-        hass.services.async_register(
-            DOMAIN,
-            SERVICE_SET_CHANNEL_CONFIG,
-            handle_set_channel_config,
-            schema=SERVICE_SET_CHANNEL_CONFIG_SCHEMA,
-        )
-        hass.services.async_register(
-            DOMAIN,
-            SERVICE_SET_DEVICE_NAME,
-            handle_set_device_name,
-            schema=SERVICE_SET_DEVICE_NAME_SCHEMA,
-        )
+        # Services are domain-wide, register them once for all entries
+        if not hass.services.has_service(DOMAIN, SERVICE_DISCOVERY_ALL):
+            _async_register_services(hass)
 
         entry.async_on_unload(entry.add_update_listener(_options_updated))
         return True
@@ -248,16 +358,25 @@ async def _options_updated(hass: HomeAssistant, entry: ConfigEntry) -> None:
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     hub: VelolinkHub = hass.data[DOMAIN].pop(entry.entry_id)
-    hass.data[DOMAIN].pop(f"{entry.entry_id}_storage")
+    storage: VelolinkStorage = hass.data[DOMAIN].pop(f"{entry.entry_id}_storage")
+    await storage.async_flush()
 
-    await hub.async_stop()
+    # Transport teardown is independent of entity removal, run them together
+    stop_task = hass.async_create_task(hub.async_stop())
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    try:
+        await stop_task
+    except Exception:  # pylint: disable=broad-except
+        _LOGGER.exception("Error stopping Velolink hub")
 
     # Remove services if this was the last instance
     if not hass.data[DOMAIN]:
         hass.services.async_remove(DOMAIN, SERVICE_DISCOVERY_BUS1)
         hass.services.async_remove(DOMAIN, SERVICE_DISCOVERY_BUS2)
         hass.services.async_remove(DOMAIN, SERVICE_DISCOVERY_ALL)
+        hass.services.async_remove(DOMAIN, SERVICE_DISCOVERY_BATCH)
         hass.services.async_remove(DOMAIN, SERVICE_SET_CHANNEL_CONFIG)
+        hass.services.async_remove(DOMAIN, SERVICE_SET_CHANNEL_CONFIG_BATCH)
         hass.services.async_remove(DOMAIN, SERVICE_SET_DEVICE_NAME)
 
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    return unload_ok
@@ -6,10 +6,7 @@ import logging
 from typing import Callable, Final
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.components.binary_sensor import (
-    BinarySensorEntity,
-    BinarySensorDeviceClass,
-)
+from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
@@ -21,16 +18,21 @@ from .const import (
     NODE_KIND_VELOMOTION,
     DEVICE_CLASS_INPUT_MAP,
     POLARITY_NC,
-    signal_new_node,
-    signal_device_name_updated,  # <-- NOWY IMPORT
+    signal_config_updated,
+    signal_device_name_updated,
 )
+from .entity import async_entity_batcher
 from .hub import VelolinkHub, VelolinkNode
-from .storage import VelolinkStorage
+from .storage import VelolinkStorage, channel_key
 
 _LOGGER = logging.getLogger(__name__)
 
 PARALLEL_UPDATES: Final[int] = 0
 
+_BINARY_SENSOR_NODE_KINDS: Final[frozenset[str]] = frozenset(
+    (NODE_KIND_INPUT, NODE_KIND_VELOSWITCH, NODE_KIND_VELOMOTION)
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
@@ -38,31 +40,27 @@ async def async_setup_entry(
     """Set up binary sensors."""
     hub: VelolinkHub = hass.data[DOMAIN][entry.entry_id]
     storage: VelolinkStorage = hass.data[DOMAIN][f"{entry.entry_id}_storage"]
-    created: set[str] = set()
+
+    add_entities, cancel_add = async_entity_batcher(hass, async_add_entities)
 
     @callback
     def _handle_new_node(node: VelolinkNode) -> None:
-        node_kinds = (NODE_KIND_INPUT, NODE_KIND_VELOSWITCH, NODE_KIND_VELOMOTION)
-        if node.kind not in node_kinds:
-            return
-
         entities = []
+        mask = node.spawned_binary_sensor
         for ch in range(node.channels):
-            uid = f"{node.bus_id}-{node.address}-in-{ch}"
-            if uid in created:
+            if mask & (1 << ch):
                 continue
-            created.add(uid)
+            mask |= 1 << ch
             entities.append(
                 VelolinkInputEntity(hass, entry.entry_id, hub, storage, node, ch)
-            )  # <-- FIX: Przekazanie entry_id
-
-        if entities:
-            async_add_entities(entities)
+            )
+        node.spawned_binary_sensor = mask
+        add_entities(entities)
 
-    unsub = async_dispatcher_connect(
-        hass, signal_new_node(entry.entry_id), _handle_new_node
+    entry.async_on_unload(cancel_add)
+    entry.async_on_unload(
+        hub.register_platform(_BINARY_SENSOR_NODE_KINDS, _handle_new_node)
     )
-    entry.async_on_unload(unsub)
 
 
 class VelolinkInputEntity(BinarySensorEntity):
@@ -80,77 +78,42 @@ class VelolinkInputEntity(BinarySensorEntity):
         ch: int,
     ) -> None:
         """Initialize entity."""
+        # pylint: disable=too-many-arguments,too-many-positional-arguments
         self._hass = hass
         self._entry_id = entry_id  # <-- FIX: Przechowaj entry_id
         self._hub = hub
         self._storage = storage
         self._node = node
         self._ch = ch
+        self._attr_unique_id = f"{node.bus_id}-{node.address}-in-{ch}"
         self._state = False
         self._unsub: Callable[[], None] | None = None
         self._unsub_name_update: Callable[[], None] | None = (
             None  # <-- FIX: Nowy subskrybent
         )
+        self._unsub_config_update: Callable[[], None] | None = None
 
+        self._cfg_key = channel_key(node.bus_id, node.address, "in", ch)
+        self._refresh_names()
         self._load_config()
 
-    def _load_config(self) -> None:
-        """Load configuration from storage."""
-        cfg = self._storage.get_channel_config(
-            self._node.bus_id, self._node.address, "in", self._ch
-        )
-        self._device_class_key = cfg.get("device_class", "none")
-        self._polarity = cfg.get("polarity", "NO")
-
-    @property
-    def unique_id(self) -> str:
-        """Return unique ID."""
-        return f"{self._node.bus_id}-{self._node.address}-in-{self._ch}"
-
-    @property
-    def name(self) -> str:
-        """Return name."""
+    def _refresh_names(self) -> None:
+        """Cache name and device info, rebuilt only when the device is renamed."""
         custom_name = self._storage.get_device_name(
             self._node.bus_id, self._node.address
         )
         if custom_name:
-            return f"{custom_name} IN {self._ch}"
-
-        if self._node.kind == NODE_KIND_VELOSWITCH:
-            return f"VeloSwitch {self._node.address}:{self._ch}"
-
-        if self._node.kind == NODE_KIND_VELOMOTION:
-            return f"VeloMotion {self._node.address}"
-
-        return f"Velolink IN {self._node.address}:{self._ch}"
-
-    @property
-    def is_on(self) -> bool:
-        """Return state."""
-        if self._polarity == POLARITY_NC:
-            return not self._state
-        return self._state
-
-    @property
-    def device_class(self) -> BinarySensorDeviceClass | None:
-        """Return device class."""
-        return DEVICE_CLASS_INPUT_MAP.get(self._device_class_key)
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        custom_name = self._storage.get_device_name(
-            self._node.bus_id, self._node.address
-        )
-
-        identifier = (DOMAIN, f"{self._node.bus_id}-{self._node.address}")
-        device_name = (
-            custom_name or f"Velolink {self._node.kind.title()} {self._node.address}"
-        )
-
-        return DeviceInfo(
-            identifiers={identifier},
-            name=device_name,
+            self._attr_name = f"{custom_name} IN {self._ch}"
+        elif self._node.kind == NODE_KIND_VELOSWITCH:
+            self._attr_name = f"VeloSwitch {self._node.address}:{self._ch}"
+        elif self._node.kind == NODE_KIND_VELOMOTION:
+            self._attr_name = f"VeloMotion {self._node.address}"
+        else:
+            self._attr_name = f"Velolink IN {self._node.address}:{self._ch}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{self._node.bus_id}-{self._node.address}")},
+            name=custom_name or self._node.display_name,
             manufacturer=self._node.manufacturer,
             model=self._node.model or f"IO-{self._node.kind.upper()}",
             sw_version=self._node.sw_version,
@@ -158,10 +121,15 @@ class VelolinkInputEntity(BinarySensorEntity):
             suggested_area=self._node.suggested_area,
         )
 
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Return extra attributes."""
-        return {
+    def _load_config(self) -> None:
+        """Load configuration from storage."""
+        cfg = self._storage.get_channel_config_by_key(self._cfg_key)
+        self._device_class_key = cfg.device_class
+        self._polarity = cfg.polarity
+        self._invert = self._polarity == POLARITY_NC
+        self._attr_device_class = DEVICE_CLASS_INPUT_MAP.get(self._device_class_key)
+        # Only changes with the channel config, not per state write
+        self._attr_extra_state_attributes = {
             "bus": self._node.bus_id,
             "address": self._node.address,
             "channel": self._ch,
@@ -169,16 +137,23 @@ class VelolinkInputEntity(BinarySensorEntity):
             "device_class_config": self._device_class_key,
         }
 
-    async def async_added_to_hass(self) -> None:
-        """Handle entity added to hass."""
+    @property
+    def is_on(self) -> bool:
+        """Return state."""
+        return self._state ^ self._invert
 
-        @callback
-        def _on_change(val: bool) -> None:
-            self._state = val
-            self.async_write_ha_state()
+    @callback
+    def _push_input(self, val: bool) -> None:
+        """Apply an input change from the hub."""
+        if val == self._state:
+            return
+        self._state = val
+        self.async_write_ha_state()
 
+    async def async_added_to_hass(self) -> None:
+        """Handle entity added to hass."""
         self._unsub = self._hub.subscribe_input(
-            self._node.bus_id, self._node.address, self._ch, _on_change
+            self._node.bus_id, self._node.address, self._ch, self._push_input
         )
 
         # <-- FIX: Dodaj subskrypcję na zmianę nazwy -->
@@ -188,12 +163,28 @@ class VelolinkInputEntity(BinarySensorEntity):
                 data["bus_id"] == self._node.bus_id
                 and data["address"] == self._node.address
             ):
+                self._refresh_names()
                 self.async_write_ha_state()
 
         self._unsub_name_update = async_dispatcher_connect(
             self._hass, signal_device_name_updated(self._entry_id), _on_name_update
         )
 
+        @callback
+        def _on_config_update(ch: int | list[int]) -> None:
+            # Batch updates carry every changed channel of the device at once
+            if ch == self._ch or (isinstance(ch, list) and self._ch in ch):
+                self._load_config()
+                self.async_write_ha_state()
+
+        self._unsub_config_update = async_dispatcher_connect(
+            self._hass,
+            signal_config_updated(
+                self._entry_id, self._node.bus_id, self._node.address
+            ),
+            _on_config_update,
+        )
+
     async def async_will_remove_from_hass(self) -> None:
         """Handle entity removal."""
         if self._unsub:
@@ -202,3 +193,6 @@ class VelolinkInputEntity(BinarySensorEntity):
         if self._unsub_name_update:  # <-- FIX: Odsubskrybuj
             self._unsub_name_update()
             self._unsub_name_update = None
+        if self._unsub_config_update:
+            self._unsub_config_update()
+            self._unsub_config_update = None
@@ -3,7 +3,8 @@
 from __future__ import annotations
 
 import logging
-from typing import Final
+from functools import partial
+from typing import Awaitable, Callable, Final
 
 from homeassistant.core import HomeAssistant
 from homeassistant.components.button import ButtonEntity
@@ -44,14 +45,15 @@ class VelolinkDiscoveryButton(ButtonEntity):
         self._hub = hub
         self._entry_id = entry_id
         self._target = target
+        self._action: Callable[[], Awaitable[None]] = {
+            "bus1": partial(hub.async_discovery_bus, "bus1"),
+            "bus2": partial(hub.async_discovery_bus, "bus2"),
+            "all": hub.async_discovery_all,
+        }[target]
         self._attr_name = name
         self._attr_unique_id = f"{entry_id}-discovery-{target}"
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._entry_id)},
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, entry_id)},
             name="Velolink Hub",
             manufacturer="Velolink",
             model="RS485 Gateway",
@@ -60,10 +62,4 @@ class VelolinkDiscoveryButton(ButtonEntity):
     async def async_press(self) -> None:
         """Handle button press."""
         _LOGGER.info("Discovery triggered for: %s", self._target)
-
-        if self._target == "bus1":
-            await self._hub.async_discovery_bus("bus1")
-        elif self._target == "bus2":
-            await self._hub.async_discovery_bus("bus2")
-        elif self._target == "all":
-            await self._hub.async_discovery_all()
+        await self._action()
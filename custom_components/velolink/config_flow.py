@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
+import asyncio
+import glob
+import ipaddress
 import logging
+import os
+import re
+import socket
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
 from typing import Any, Dict, Optional
 
 import voluptuous as vol
 from homeassistant import config_entries
-from homeassistant.core import callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.data_entry_flow import FlowResult
 import homeassistant.helpers.config_validation as cv
 
@@ -21,34 +31,42 @@ from .const import (
     CONF_GATEWAY_HOST,
     CONF_GATEWAY_PORT,
     CONF_CONNECTION_TYPE,
+    CONF_THREADED_WRITER,
+    CONF_READ_BUFFER_SIZE,
     CONN_TYPE_SERIAL,
     CONN_TYPE_TCP,
     DEFAULT_BAUDRATE,
     DEFAULT_RTS_TOGGLE,
     DEFAULT_SCAN_ON_STARTUP,
     DEFAULT_GATEWAY_PORT,
+    DEFAULT_THREADED_WRITER,
+    DEFAULT_READ_BUFFER_SIZE,
     DEVICE_CLASS_INPUT_MAP,
     DEVICE_CLASS_OUTPUT_MAP,
     POLARITY_NO,
     POLARITY_NC,
     # Stałe do OptionsFlow
-    NODE_KIND_INPUT,
-    NODE_KIND_OUTPUT,
-    NODE_KIND_VELOSWITCH,
-    NODE_KIND_VELOMOTION,
-    SERVICE_SET_CHANNEL_CONFIG,
+    SERVICE_SET_CHANNEL_CONFIG_BATCH,
     SERVICE_SET_DEVICE_NAME,
     ATTR_BUS_ID,
     ATTR_ADDRESS,
     ATTR_CHANNEL,
+    ATTR_CHANNEL_TYPE,
     ATTR_DEVICE_CLASS,
     ATTR_POLARITY,
     ATTR_DEVICE_NAME,
+    ATTR_CHANNELS,
     CONN_TYPE_DEMO,
 )
 from .hub import VelolinkHub
 from .storage import VelolinkStorage
 
+try:
+    from serial.tools.list_ports import comports as _comports
+except ImportError:
+    # Fallback dla środowisk bez pyserial
+    _comports = None
+
 _LOGGER = logging.getLogger(__name__)
 
 # Stałe dla nowego wyboru
@@ -58,27 +76,245 @@ CONN_CHOICE_TCP = "tcp"
 CONN_CHOICE_DEMO = "demo"
 
 
-def _list_serial_ports() -> dict[str, str]:
-    """List and categorize available serial ports."""
-    # pylint: disable=import-outside-toplevel,import-error
+# Schemas without runtime data are built once at import
+# Porty szeregowe są skanowane dopiero w krokach HAT/USB
+_USER_SCHEMA = vol.Schema(
+    {
+        vol.Required("connection_choice"): vol.In(
+            {
+                CONN_CHOICE_DEMO: "Tryb Demo (testowanie bez sprzętu)",
+                CONN_CHOICE_RPI_HAT: "Raspberry Pi HAT",
+                CONN_CHOICE_USB: "Adapter USB-RS485",
+                CONN_CHOICE_TCP: "TCP (VeloGateway)",
+            }
+        )
+    }
+)
+_TCP_SCHEMA = vol.Schema(
+    {
+        vol.Required(CONF_GATEWAY_HOST): str,
+        vol.Required(CONF_GATEWAY_PORT, default=DEFAULT_GATEWAY_PORT): cv.port,
+        vol.Required(CONF_SCAN_ON_STARTUP, default=DEFAULT_SCAN_ON_STARTUP): bool,
+        vol.Optional(CONF_READ_BUFFER_SIZE, default=DEFAULT_READ_BUFFER_SIZE): vol.All(
+            cv.positive_int, vol.Range(min=1024)
+        ),
+    }
+)
+# Serial fields shared by the HAT and USB steps; only USB adds port choices
+_USB_BASE = {
+    vol.Required(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): cv.positive_int,
+    vol.Required(CONF_RTS_TOGGLE, default=DEFAULT_RTS_TOGGLE): bool,
+    vol.Required(CONF_SCAN_ON_STARTUP, default=DEFAULT_SCAN_ON_STARTUP): bool,
+    vol.Optional(CONF_THREADED_WRITER, default=DEFAULT_THREADED_WRITER): bool,
+}
+# Dla HAT nie pytamy o port, zakładamy że jest jeden
+_HAT_SCHEMA = vol.Schema(_USB_BASE)
+_EMPTY_SCHEMA = vol.Schema({})
+
+_DEVICE_CLASS_ALL = {**DEVICE_CLASS_INPUT_MAP, **DEVICE_CLASS_OUTPUT_MAP}
+_DEVICE_CLASS_ALL_KEYS = tuple(_DEVICE_CLASS_ALL)
+
+# Enumeration can take seconds on some hosts, reuse it across form re-renders
+_PORTS_TTL = 5.0
+_PORTS_CACHE: tuple[float, Ports] | None = None
+# Concurrent flows wait for one enumeration instead of starting their own
+_PORTS_LOCK = asyncio.Lock()
+_COMPORTS_TIMEOUT_S = 2.0
+_FALLBACK_PORTS = {
+    "/dev/ttyAMA0": "Raspberry Pi HAT (/dev/ttyAMA0)",
+    "/dev/ttyUSB0": "USB Adapter (/dev/ttyUSB0)",
+}
+
+
+_RPI_HAT_PORT = "/dev/ttyAMA0"
+
+# Group 1: RPi HAT UART, group 2: USB adapter
+_PORT_KIND_RE = re.compile(r"(ttyAMA|serial)|(ttyUSB|ttyACM)")
+
+
+@dataclass
+class Ports:
+    """Serial ports keyed by device path, split into HAT and USB candidates."""
+
+    all: dict[str, str]
+    hat: dict[str, str] = field(init=False)
+    usb: dict[str, str] = field(init=False)
+    usb_with_none: dict[str, str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        """Categorize the ports in a single pass per enumeration."""
+        self.hat = {}
+        self.usb = {}
+        for path, description in self.all.items():
+            match = _PORT_KIND_RE.search(path)
+            if match is None:
+                continue
+            if match.lastindex == 1:
+                self.hat[path] = description
+            else:
+                self.usb[path] = description
+        # Wybór drugiego portu jest opcjonalny
+        self.usb_with_none = {"": "(brak)", **self.usb}
+
+    @cached_property
+    def usb_schema(self) -> vol.Schema:
+        """Return the USB step schema, compiled once per enumeration."""
+        return vol.Schema(
+            {
+                vol.Required(CONF_PORT1): vol.In(self.usb),
+                vol.Optional(CONF_PORT2): vol.In(self.usb_with_none),
+                **_USB_BASE,
+            }
+        )
+
+
+def _is_bluetooth_port(port: Any) -> bool:
+    """Return True for Bluetooth SPP/virtual ports."""
+    description = (port.description or "").lower()
+    if "bluetooth" in description or "BTHENUM" in (port.hwid or "").upper():
+        return True
+    return port.device.startswith(("/dev/cu.Bluetooth", "/dev/tty.Bluetooth"))
+
+
+# rfcomm (Bluetooth) nodes are deliberately absent, so nothing here is probed
+_LINUX_PORT_GLOBS = ("/dev/ttyUSB*", "/dev/ttyACM*", "/dev/ttyAMA*", "/dev/serial[0-9]")
+
+
+def _list_serial_ports_fast_linux() -> dict[str, str]:
+    """List serial ports from /dev without pyserial's sysfs walk."""
+    # Nazwy z /dev/serial/by-id opisują adapter lepiej niż sama ścieżka
+    by_id = {
+        os.path.realpath(link): os.path.basename(link)
+        for link in glob.glob("/dev/serial/by-id/*")
+    }
+    ports = {}
+    for device_path in sorted({p for g in _LINUX_PORT_GLOBS for p in glob.glob(g)}):
+        if "ttyAMA" in device_path or "serial" in device_path:
+            ports[device_path] = f"Raspberry Pi HAT ({device_path})"
+        else:
+            name = by_id.get(os.path.realpath(device_path), "USB Adapter")
+            ports[device_path] = f"{name} ({device_path})"
+    return ports
+
+
+def _list_comports() -> dict[str, str]:
+    """List serial ports through pyserial."""
     ports = {}
+    for port in _comports():
+        if _is_bluetooth_port(port):
+            continue
+        device_path = port.device
+        description = f"{port.description} ({device_path})"
+        if "ttyAMA" in device_path or "serial" in device_path:
+            # To prawdopodobnie RPi HAT
+            ports[device_path] = f"Raspberry Pi HAT ({device_path})"
+        else:
+            # To prawdopodobnie adapter USB
+            ports[device_path] = description
+    return ports
+
+
+def _list_serial_ports() -> Ports:
+    """List and categorize available serial ports."""
+    # pylint: disable=global-statement
+    global _PORTS_CACHE
+
+    now = time.monotonic()
+    if _PORTS_CACHE is not None and now - _PORTS_CACHE[0] < _PORTS_TTL:
+        return _PORTS_CACHE[1]
+
+    if sys.platform.startswith("linux"):
+        fast_ports = _list_serial_ports_fast_linux()
+        if fast_ports:
+            _PORTS_CACHE = (now, Ports(fast_ports))
+            return _PORTS_CACHE[1]
+
+    if _comports is None:
+        # Fallback dla środowisk bez pyserial
+        _PORTS_CACHE = (now, Ports(dict(_FALLBACK_PORTS)))
+        return _PORTS_CACHE[1]
+
     try:
-        from serial.tools import list_ports
-
-        for port in list_ports.comports():
-            device_path = port.device
-            description = f"{port.description} ({device_path})"
-            if "ttyAMA" in device_path or "serial" in device_path:
-                # To prawdopodobnie RPi HAT
-                ports[device_path] = f"Raspberry Pi HAT ({device_path})"
-            else:
-                # To prawdopodobnie adapter USB
-                ports[device_path] = description
+        ports = _list_comports()
     except Exception:  # pylint: disable=broad-exception-caught
-        # Fallback dla środowisk bez pyserial
-        ports["/dev/ttyAMA0"] = "Raspberry Pi HAT (/dev/ttyAMA0)"
-        ports["/dev/ttyUSB0"] = "USB Adapter (/dev/ttyUSB0)"
-    return ports
+        _LOGGER.exception("Serial port enumeration failed, using defaults")
+        ports = dict(_FALLBACK_PORTS)
+
+    _PORTS_CACHE = (now, Ports(ports))
+    return _PORTS_CACHE[1]
+
+
+async def _async_list_serial_ports(hass: HomeAssistant) -> Ports:
+    """Return the shared port scan, enumerating at most once at a time."""
+    async with _PORTS_LOCK:
+        if _PORTS_CACHE is not None and time.monotonic() - _PORTS_CACHE[0] < _PORTS_TTL:
+            return _PORTS_CACHE[1]
+        # comports() walks the registry on Windows and may stall on some drivers;
+        # a stalled scan still fills the cache for later flows when it finishes
+        try:
+            return await asyncio.wait_for(
+                hass.async_add_executor_job(_list_serial_ports), _COMPORTS_TIMEOUT_S
+            )
+        except asyncio.TimeoutError:
+            _LOGGER.warning(
+                "Serial port enumeration took longer than %.1fs, using defaults",
+                _COMPORTS_TIMEOUT_S,
+            )
+            return Ports(dict(_FALLBACK_PORTS))
+
+
+def _join_unique(values: Any) -> str:
+    """Join values for a form placeholder, dropping repeats but keeping order."""
+    return ", ".join(dict.fromkeys(map(str, values)))
+
+
+def _serial_uid(port1: str, port2: str | None) -> str:
+    """Return the config entry unique_id for a serial connection."""
+    return "-".join(("serial", port1, port2 or ""))
+
+
+def _tcp_uid(host: str, port: int) -> str:
+    """Return the config entry unique_id for a TCP gateway."""
+    return f"tcp-{host}-{port}"
+
+
+# Delay before racing the next resolved address (RFC 8305 "happy eyeballs")
+_HAPPY_EYEBALLS_DELAY_S = 0.25
+# The gateway sits on the local network, a healthy one accepts well within this
+_PROBE_TIMEOUT_S = 1.5
+
+
+def _host_family(host: str) -> int:
+    """Return the address family of an IP literal, AF_UNSPEC for hostnames."""
+    try:
+        address = ipaddress.ip_address(host)
+    except ValueError:
+        return socket.AF_UNSPEC
+    return socket.AF_INET6 if address.version == 6 else socket.AF_INET
+
+
+async def _async_probe_gateway(host: str, port: int) -> bool:
+    """Check that the gateway accepts TCP connections without blocking the loop."""
+    try:
+        _reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(
+                host,
+                port,
+                family=_host_family(host),
+                happy_eyeballs_delay=_HAPPY_EYEBALLS_DELAY_S,
+            ),
+            timeout=_PROBE_TIMEOUT_S,
+        )
+    except (OSError, asyncio.TimeoutError):
+        return False
+
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        # The gateway accepted the connection, a reset while closing is harmless
+        pass
+    return True
 
 
 class VelolinkConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -86,43 +322,31 @@ class VelolinkConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    _CHOICE_DISPATCH = {
+        CONN_CHOICE_RPI_HAT: "async_step_serial_hat",
+        CONN_CHOICE_USB: "async_step_serial_usb",
+        CONN_CHOICE_TCP: "async_step_tcp",
+        CONN_CHOICE_DEMO: "async_step_demo",
+    }
+
     def __init__(self) -> None:
         """Initialize config flow."""
         self._connection_type: str | None = None
 
+    async def _async_get_ports(self) -> Ports:
+        """Return serial ports from the shared short-lived cache."""
+        return await _async_list_serial_ports(self.hass)
+
     async def async_step_user(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Handle the initial step where the user chooses the connection type."""
         if user_input is not None:
             self._connection_type = user_input["connection_choice"]
-            if self._connection_type == CONN_CHOICE_RPI_HAT:
-                return await self.async_step_serial_hat()
-            if self._connection_type == CONN_CHOICE_USB:
-                return await self.async_step_serial_usb()
-            if self._connection_type == CONN_CHOICE_TCP:
-                return await self.async_step_tcp()
-            if self._connection_type == CONN_CHOICE_DEMO:
-                return await self.async_step_demo()
-
-        # Opcja demo jest zawsze dostępna
-        options = {CONN_CHOICE_DEMO: "Tryb Demo (testowanie bez sprzętu)"}
+            step = getattr(self, self._CHOICE_DISPATCH[self._connection_type])
+            return await step()
 
-        # Sprawdź, czy są porty charakterystyczne dla RPi HAT
-        all_ports = await self.hass.async_add_executor_job(_list_serial_ports)
-        has_rpi_hat_port = any("ttyAMA" in p or "serial" in p for p in all_ports)
-
-        if has_rpi_hat_port:
-            options[CONN_CHOICE_RPI_HAT] = "Raspberry Pi HAT"
-
-        if all_ports:
-            options[CONN_CHOICE_USB] = "Adapter USB-RS485"
-
-        options[CONN_CHOICE_TCP] = "TCP (VeloGateway)"
-
-        schema = vol.Schema({vol.Required("connection_choice"): vol.In(options)})
-
-        return self.async_show_form(step_id="user", data_schema=schema)
+        return self.async_show_form(step_id="user", data_schema=_USER_SCHEMA)
 
     async def _create_serial_entry(
         self, user_input: dict[str, Any], title: str
@@ -137,13 +361,12 @@ class VelolinkConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if port2 and port1 == port2:
             return self.async_show_form(
                 step_id="serial_usb",
-                data_schema=self.data_schema,
+                data_schema=(await self._async_get_ports()).usb_schema,
                 errors={"base": "ports_identical"},
             )
 
         user_input[CONF_CONNECTION_TYPE] = CONN_TYPE_SERIAL
-        uid = f"serial-{port1}-{port2 or ''}"
-        await self.async_set_unique_id(uid)
+        await self.async_set_unique_id(_serial_uid(port1, port2))
         self._abort_if_unique_id_configured()
 
         return self.async_create_entry(title=title, data=user_input)
@@ -152,41 +375,28 @@ class VelolinkConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Handle RPi HAT serial connection setup."""
-        all_ports = await self.hass.async_add_executor_job(_list_serial_ports)
-        hat_ports = {
-            p: d for p, d in all_ports.items() if "ttyAMA" in p or "serial" in p
-        }
+        # Na RPi z HAT port jest stały - jeden stat zamiast pełnego skanowania
+        if await self.hass.async_add_executor_job(os.path.exists, _RPI_HAT_PORT):
+            hat_ports = {_RPI_HAT_PORT: f"Raspberry Pi HAT ({_RPI_HAT_PORT})"}
+        else:
+            hat_ports = (await self._async_get_ports()).hat
 
         if not hat_ports:
             return self.async_abort(reason="no_hat_ports_found")
 
         if user_input is not None:
-            user_input[CONF_PORT1] = hat_ports.popitem()[
-                0
-            ]  # Zawsze bierz pierwszy znaleziony port HAT
+            # Zawsze bierz pierwszy znaleziony port HAT
+            user_input[CONF_PORT1] = next(iter(hat_ports))
             return await self._create_serial_entry(user_input, "Velolink RPi HAT")
 
-        # Dla HAT nie pytamy o port, zakładamy że jest jeden
-        schema = vol.Schema(
-            {
-                vol.Required(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): cv.positive_int,
-                vol.Required(CONF_RTS_TOGGLE, default=DEFAULT_RTS_TOGGLE): bool,
-                vol.Required(
-                    CONF_SCAN_ON_STARTUP, default=DEFAULT_SCAN_ON_STARTUP
-                ): bool,
-            }
-        )
-
-        return self.async_show_form(step_id="serial_hat", data_schema=schema)
+        return self.async_show_form(step_id="serial_hat", data_schema=_HAT_SCHEMA)
 
     async def async_step_serial_usb(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Handle USB adapter serial connection setup."""
-        all_ports = await self.hass.async_add_executor_job(_list_serial_ports)
-        usb_ports = {
-            p: d for p, d in all_ports.items() if "ttyUSB" in p or "ttyACM" in p
-        }
+        ports = await self._async_get_ports()
+        usb_ports = ports.usb
 
         if not usb_ports:
             return self.async_abort(reason="no_usb_ports_found")
@@ -196,47 +406,30 @@ class VelolinkConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 user_input, f"Velolink USB ({user_input[CONF_PORT1]})"
             )
 
-        schema = vol.Schema(
-            {
-                vol.Required(CONF_PORT1): vol.In(usb_ports),
-                vol.Optional(CONF_PORT2): vol.In({"": "(brak)"} | usb_ports),
-                vol.Required(CONF_BAUDRATE, default=DEFAULT_BAUDRATE): cv.positive_int,
-                vol.Required(CONF_RTS_TOGGLE, default=DEFAULT_RTS_TOGGLE): bool,
-                vol.Required(
-                    CONF_SCAN_ON_STARTUP, default=DEFAULT_SCAN_ON_STARTUP
-                ): bool,
-            }
-        )
-
-        return self.async_show_form(step_id="serial_usb", data_schema=schema)
+        return self.async_show_form(step_id="serial_usb", data_schema=ports.usb_schema)
 
     async def async_step_tcp(
         self, user_input: Optional[Dict[str, Any]] = None
     ) -> FlowResult:
         """Handle TCP connection setup."""
+        errors: dict[str, str] = {}
         if user_input is not None:
             user_input[CONF_CONNECTION_TYPE] = CONN_TYPE_TCP
             host = user_input[CONF_GATEWAY_HOST]
             port = user_input[CONF_GATEWAY_PORT]
-            uid = f"tcp-{host}-{port}"
-            await self.async_set_unique_id(uid)
+            await self.async_set_unique_id(_tcp_uid(host, port))
             self._abort_if_unique_id_configured()
 
-            return self.async_create_entry(
-                title=f"Velolink Gateway ({host})",
-                data=user_input,
-            )
+            if await _async_probe_gateway(host, port):
+                return self.async_create_entry(
+                    title=f"Velolink Gateway ({host})",
+                    data=user_input,
+                )
+            errors["base"] = "cannot_connect"
 
-        schema = vol.Schema(
-            {
-                vol.Required(CONF_GATEWAY_HOST): str,
-                vol.Required(CONF_GATEWAY_PORT, default=DEFAULT_GATEWAY_PORT): cv.port,
-                vol.Required(
-                    CONF_SCAN_ON_STARTUP, default=DEFAULT_SCAN_ON_STARTUP
-                ): bool,
-            }
+        return self.async_show_form(
+            step_id="tcp", data_schema=_TCP_SCHEMA, errors=errors
         )
-        return self.async_show_form(step_id="tcp", data_schema=schema)
 
     async def async_step_demo(
         self, user_input: Optional[Dict[str, Any]] = None
@@ -263,8 +456,24 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
         """Initialize options flow."""
         self._config_entry = config_entry
         # Store intermediate data between steps
-        self._channel_to_edit: dict[str, Any] | None = None
-        self._device_to_edit: dict[str, Any] | None = None
+        self._channels_to_edit: list[tuple[str, int, str, int]] = []
+        self._device_to_edit: tuple[str, int] | None = None
+        self._hub: VelolinkHub | None = None
+        self._storage: VelolinkStorage | None = None
+
+    def _get_hub(self) -> VelolinkHub:
+        """Return the hub of this entry, looked up once per flow."""
+        if self._hub is None:
+            self._hub = self.hass.data[DOMAIN][self._config_entry.entry_id]
+        return self._hub
+
+    def _get_storage(self) -> VelolinkStorage:
+        """Return the storage of this entry, looked up once per flow."""
+        if self._storage is None:
+            self._storage = self.hass.data[DOMAIN][
+                f"{self._config_entry.entry_id}_storage"
+            ]
+        return self._storage
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -286,29 +495,29 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
         if DOMAIN not in self.hass.data:
             return self.async_abort(reason="integration_not_setup")
 
+        hub = self._get_hub()
+
         if user_input is not None:
             bus_id = user_input["bus_selection"]
-            # Call the discovery service
-            await self.hass.services.async_call(
-                DOMAIN,
-                f"discovery_{bus_id}",
-                blocking=True,  # Wait for the service to finish
-            )
+            # Scan only this entry's hub; "all" scans its buses concurrently
+            if bus_id == "all":
+                await hub.async_discovery_all()
+            else:
+                await hub.async_discovery_bus(bus_id)
             # Show a result message
             return self.async_show_form(
                 step_id="scan_result",
-                data_schema=vol.Schema({}),
+                data_schema=_EMPTY_SCHEMA,
                 description_placeholders={
                     "result": f"Skanowanie magistrali {bus_id} zakończone. Sprawdź logi, jeśli nowe urządzenia nie pojawiły się."
                 },
             )
 
-        hub: VelolinkHub = self.hass.data[DOMAIN][self._config_entry.entry_id]
-        buses = list(hub._buses_cfg.keys())
-        options = {bus: f"Magistrala {bus.title()}" for bus in buses}
         return self.async_show_form(
             step_id="scan_devices",
-            data_schema=vol.Schema({vol.Required("bus_selection"): vol.In(options)}),
+            data_schema=vol.Schema(
+                {vol.Required("bus_selection"): vol.In(hub.bus_options)}
+            ),
         )
 
     async def async_step_scan_result(
@@ -324,69 +533,67 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
         if DOMAIN not in self.hass.data:
             return self.async_abort(reason="integration_not_setup")
 
-        hub: VelolinkHub = self.hass.data[DOMAIN][self._config_entry.entry_id]
-        storage: VelolinkStorage = self.hass.data[DOMAIN][
-            f"{self._config_entry.entry_id}_storage"
-        ]
+        # Snapshot: a running discovery may re-index nodes while the form is open
+        hub = self._get_hub()
+        channels_index = dict(hub.channels_index)
+        devices = tuple(hub.device_labels.values())
+        storage = self._get_storage()
+
+        # Device names are looked up once per node, not once per channel
+        stored = storage.get_device_names(
+            (bus_id, addr) for bus_id, addr, _default in devices
+        )
+        names = {
+            (bus_id, addr): name or f"Urządzenie {addr}"
+            for (bus_id, addr), name in stored.items()
+        }
 
         # Build a list of all available channels
-        channels = {}
-        for (bus_id, addr), node in hub._nodes.items():
-            ch_type = None
-            if node.kind in (
-                NODE_KIND_INPUT,
-                NODE_KIND_VELOSWITCH,
-                NODE_KIND_VELOMOTION,
-            ):
-                ch_type = "in"
-            elif node.kind == NODE_KIND_OUTPUT:
-                ch_type = "out"
-
-            if ch_type:
-                for ch in range(node.channels):
-                    key = f"{bus_id}-{addr}-{ch_type}-{ch}"
-                    custom_name = storage.get_device_name(bus_id, addr)
-                    name = custom_name or f"Urządzenie {addr}"
-                    channels[key] = f"{name} ({ch_type.upper()} {ch}) na {bus_id}"
+        channels = {
+            key: f"{names[bus_id, addr]} {suffix}"
+            for key, (bus_id, addr, _type, _ch, suffix) in channels_index.items()
+        }
 
         if not channels:
             return self.async_abort(reason="no_channels")
 
-        if user_input is not None:
-            self._channel_to_edit = user_input["channel"]
-            parts = self._channel_to_edit.split("-")
-            bus_id, addr, ch_type, ch = parts[0], int(parts[1]), parts[2], int(parts[3])
-
-            device_class_options = {
-                **DEVICE_CLASS_INPUT_MAP,
-                **DEVICE_CLASS_OUTPUT_MAP,
-            }
+        selected = [
+            channels_index[key][:4]
+            for key in (user_input or {}).get("channel", [])
+            if key in channels_index
+        ]
+        if selected:
+            self._channels_to_edit = selected
 
-            current_config = storage.get_channel_config(bus_id, addr, ch_type, ch)
+            # Domyślne wartości z pierwszego wybranego kanału
+            current_config = storage.get_channel_config(*selected[0])
+            buses, addrs, ch_types, chs = zip(*selected)
 
             return self.async_show_form(
                 step_id="configure_channel",
                 data_schema=vol.Schema(
                     {
                         vol.Required(
-                            "device_class", default=current_config.get("device_class")
-                        ): vol.In(list(device_class_options.keys())),
+                            "device_class", default=current_config.device_class
+                        ): vol.In(_DEVICE_CLASS_ALL_KEYS),
                         vol.Required(
-                            "polarity", default=current_config.get("polarity")
+                            "polarity", default=current_config.polarity
                         ): vol.In([POLARITY_NO, POLARITY_NC]),
                     }
                 ),
                 description_placeholders={
-                    "bus_id": bus_id,
-                    "address": addr,
-                    "channel": ch,
-                    "type": ch_type.upper(),
+                    "bus_id": _join_unique(buses),
+                    "address": _join_unique(addrs),
+                    "channel": _join_unique(chs),
+                    "type": _join_unique(t.upper() for t in ch_types),
                 },
             )
 
         return self.async_show_form(
             step_id="edit_channel",
-            data_schema=vol.Schema({vol.Required("channel"): vol.In(channels)}),
+            data_schema=vol.Schema(
+                {vol.Required("channel"): cv.multi_select(channels)}
+            ),
             description_placeholders={"count": len(channels)},
         )
 
@@ -394,20 +601,23 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Save the new channel configuration."""
-        if user_input is not None and self._channel_to_edit:
-            parts = self._channel_to_edit.split("-")
-            bus_id, addr, ch_type, ch = parts[0], int(parts[1]), parts[2], int(parts[3])
-
-            # Call the service to update the config
+        if user_input is not None and self._channels_to_edit:
+            # One service call for all selected channels
             await self.hass.services.async_call(
                 DOMAIN,
-                SERVICE_SET_CHANNEL_CONFIG,
+                SERVICE_SET_CHANNEL_CONFIG_BATCH,
                 {
-                    ATTR_BUS_ID: bus_id,
-                    ATTR_ADDRESS: addr,
-                    ATTR_CHANNEL: ch,
-                    ATTR_DEVICE_CLASS: user_input["device_class"],
-                    ATTR_POLARITY: user_input["polarity"],
+                    ATTR_CHANNELS: [
+                        {
+                            ATTR_BUS_ID: bus_id,
+                            ATTR_ADDRESS: addr,
+                            ATTR_CHANNEL: ch,
+                            ATTR_CHANNEL_TYPE: ch_type,
+                            ATTR_DEVICE_CLASS: user_input["device_class"],
+                            ATTR_POLARITY: user_input["polarity"],
+                        }
+                        for bus_id, addr, ch_type, ch in self._channels_to_edit
+                    ]
                 },
                 blocking=True,
             )
@@ -424,24 +634,24 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
         if DOMAIN not in self.hass.data:
             return self.async_abort(reason="integration_not_setup")
 
-        hub: VelolinkHub = self.hass.data[DOMAIN][self._config_entry.entry_id]
-        storage: VelolinkStorage = self.hass.data[DOMAIN][
-            f"{self._config_entry.entry_id}_storage"
-        ]
+        # Snapshot: a running discovery may re-index nodes while the form is open
+        device_labels = dict(self._get_hub().device_labels)
+        storage = self._get_storage()
 
-        devices = {}
-        for (bus_id, addr), node in hub._nodes.items():
-            key = f"{bus_id}-{addr}"
-            custom_name = storage.get_device_name(bus_id, addr)
-            name = custom_name or f"Velolink {node.kind.title()} {addr}"
-            devices[key] = f"{name} ({bus_id})"
+        names = storage.get_device_names(
+            (bus_id, addr) for bus_id, addr, _default in device_labels.values()
+        )
+        devices = {
+            key: f"{names[bus_id, addr] or default_name} ({bus_id})"
+            for key, (bus_id, addr, default_name) in device_labels.items()
+        }
 
         if not devices:
             return self.async_abort(reason="no_devices")
 
-        if user_input is not None:
-            self._device_to_edit = user_input["device"]
-            bus_id, addr = self._device_to_edit.split("-")
+        if user_input is not None and user_input["device"] in device_labels:
+            bus_id, addr, _default_name = device_labels[user_input["device"]]
+            self._device_to_edit = (bus_id, addr)
             current_name = storage.get_device_name(bus_id, addr) or ""
 
             return self.async_show_form(
@@ -450,7 +660,7 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
                     {vol.Required("new_name", default=current_name): str}
                 ),
                 description_placeholders={
-                    "device": devices[self._device_to_edit],
+                    "device": devices[user_input["device"]],
                     "current": current_name,
                 },
             )
@@ -466,7 +676,7 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
     ) -> FlowResult:
         """Save the new device name."""
         if user_input is not None and self._device_to_edit:
-            bus_id, addr = self._device_to_edit.split("-")
+            bus_id, addr = self._device_to_edit
 
             # Call the service to update the name
             await self.hass.services.async_call(
@@ -474,7 +684,7 @@ class VelolinkOptionsFlow(config_entries.OptionsFlow):
                 SERVICE_SET_DEVICE_NAME,
                 {
                     ATTR_BUS_ID: bus_id,
-                    ATTR_ADDRESS: int(addr),
+                    ATTR_ADDRESS: addr,
                     ATTR_DEVICE_NAME: user_input["new_name"],
                 },
                 blocking=True,
@@ -1,7 +1,9 @@
 """Constants for Velolink integration."""
 
 from __future__ import annotations
-from enum import IntEnum
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Final
 from homeassistant.components.binary_sensor import BinarySensorDeviceClass
 from homeassistant.components.switch import SwitchDeviceClass
 
@@ -16,6 +18,8 @@ CONF_SCAN_ON_STARTUP = "scan_on_startup"
 CONF_GATEWAY_HOST = "gateway_host"
 CONF_GATEWAY_PORT = "gateway_port"
 CONF_CONNECTION_TYPE = "connection_type"
+CONF_THREADED_WRITER = "threaded_writer"
+CONF_READ_BUFFER_SIZE = "read_buffer_size"
 
 # Connection types
 CONN_TYPE_SERIAL = "serial"
@@ -26,24 +30,25 @@ DEFAULT_BAUDRATE = 115200
 DEFAULT_RTS_TOGGLE = False
 DEFAULT_SCAN_ON_STARTUP = True
 DEFAULT_GATEWAY_PORT = 5485
+DEFAULT_THREADED_WRITER = False
+DEFAULT_READ_BUFFER_SIZE = 64 * 1024
 
 
-# Signals
-def signal_new_node(entry_id: str) -> str:
-    """Signal for new node discovered."""
-    return f"{DOMAIN}.{entry_id}.new_node"
-
-
+# Signals (entry-level names are built once per entry and then reused)
+@lru_cache(maxsize=32)
 def signal_discovery_complete(entry_id: str) -> str:
     """Signal for discovery complete."""
     return f"{DOMAIN}.{entry_id}.discovery_complete"
 
 
-def signal_channel_config_updated(entry_id: str) -> str:
-    """Signal for channel config updated."""
-    return f"{DOMAIN}.{entry_id}.config_updated"
+# Built by every config-aware entity, up to 254 devices on each of two buses
+@lru_cache(maxsize=1024)
+def signal_config_updated(entry_id: str, bus_id: str, address: int) -> str:
+    """Signal for channel config updated on a single device."""
+    return f"{DOMAIN}.{entry_id}.{bus_id}.{address}.config_updated"
 
 
+@lru_cache(maxsize=32)
 def signal_device_name_updated(entry_id: str) -> str:
     """Signal for device name updated."""
     return f"{DOMAIN}.{entry_id}.device_name_updated"
@@ -53,6 +58,9 @@ def signal_device_name_updated(entry_id: str) -> str:
 DISCOVERY_INTERVAL_S = 30.0
 BUS_POLL_INTERVAL_S = 0.02
 GATEWAY_RECONNECT_DELAY_S = 5.0
+DISCOVERY_TIMEOUT_S = 2.0
+DISCOVERY_SETTLE_S = 0.5
+ENTITY_ADD_BATCH_S = 0.1
 
 # Node kinds
 NODE_KIND_INPUT = "input"
@@ -65,25 +73,29 @@ NODE_KIND_VELOMOTION = "velomotion"
 NODE_KIND_VELOSENSOR = "velosensor"
 
 # Device Classes for inputs
-DEVICE_CLASS_INPUT_MAP = {
-    "none": None,
-    "door": BinarySensorDeviceClass.DOOR,
-    "garage_door": BinarySensorDeviceClass.GARAGE_DOOR,
-    "window": BinarySensorDeviceClass.WINDOW,
-    "motion": BinarySensorDeviceClass.MOTION,
-    "occupancy": BinarySensorDeviceClass.OCCUPANCY,
-    "opening": BinarySensorDeviceClass.OPENING,
-    "tamper": BinarySensorDeviceClass.TAMPER,
-    "smoke": BinarySensorDeviceClass.SMOKE,
-    "moisture": BinarySensorDeviceClass.MOISTURE,
-}
+DEVICE_CLASS_INPUT_MAP = MappingProxyType(
+    {
+        "none": None,
+        "door": BinarySensorDeviceClass.DOOR,
+        "garage_door": BinarySensorDeviceClass.GARAGE_DOOR,
+        "window": BinarySensorDeviceClass.WINDOW,
+        "motion": BinarySensorDeviceClass.MOTION,
+        "occupancy": BinarySensorDeviceClass.OCCUPANCY,
+        "opening": BinarySensorDeviceClass.OPENING,
+        "tamper": BinarySensorDeviceClass.TAMPER,
+        "smoke": BinarySensorDeviceClass.SMOKE,
+        "moisture": BinarySensorDeviceClass.MOISTURE,
+    }
+)
 
 # Device Classes for outputs
-DEVICE_CLASS_OUTPUT_MAP = {
-    "none": None,
-    "outlet": SwitchDeviceClass.OUTLET,
-    "switch": SwitchDeviceClass.SWITCH,
-}
+DEVICE_CLASS_OUTPUT_MAP = MappingProxyType(
+    {
+        "none": None,
+        "outlet": SwitchDeviceClass.OUTLET,
+        "switch": SwitchDeviceClass.SWITCH,
+    }
+)
 
 # Polarity
 POLARITY_NO = "NO"
@@ -97,33 +109,60 @@ STORAGE_KEY = f"{DOMAIN}.storage"
 SERVICE_DISCOVERY_BUS1 = "discovery_bus1"
 SERVICE_DISCOVERY_BUS2 = "discovery_bus2"
 SERVICE_DISCOVERY_ALL = "discovery_all"
+SERVICE_DISCOVERY_BATCH = "discovery_batch"
 SERVICE_SET_CHANNEL_CONFIG = "set_channel_config"
+SERVICE_SET_CHANNEL_CONFIG_BATCH = "set_channel_config_batch"
 SERVICE_SET_DEVICE_NAME = "set_device_name"
 
 # Service attributes
 ATTR_BUS_ID = "bus_id"
 ATTR_ADDRESS = "address"
 ATTR_CHANNEL = "channel"
+ATTR_CHANNEL_TYPE = "channel_type"
 ATTR_DEVICE_CLASS = "device_class"
 ATTR_POLARITY = "polarity"
 ATTR_DEVICE_NAME = "device_name"
+ATTR_CHANNELS = "channels"
 
 
 # Protocol - Function Codes
-class FunctionCode(IntEnum):
-    """RS485 protocol function codes."""
-
-    DISCOVER = 0x01
-    HELLO = 0x02
-    READ_INPUTS = 0x03
-    SET_OUTPUT = 0x10
-    SET_PWM = 0x11
-    INPUT_CHANGE = 0x20
-    OUTPUT_STATE = 0x21
-    PWM_STATE = 0x22
-    ANALOG_SAMPLE = 0x23
-    BUTTON_EVENT = 0x24
-    ENCODER_EVENT = 0x25
+class FunctionCode:
+    """RS485 protocol function codes.
+
+    Plain ints rather than an IntEnum, so the RX parser compares raw ints.
+    """
+
+    DISCOVER: Final[int] = 0x01
+    HELLO: Final[int] = 0x02
+    READ_INPUTS: Final[int] = 0x03
+    SET_OUTPUT: Final[int] = 0x10
+    SET_PWM: Final[int] = 0x11
+    INPUT_CHANGE: Final[int] = 0x20
+    OUTPUT_STATE: Final[int] = 0x21
+    PWM_STATE: Final[int] = 0x22
+    ANALOG_SAMPLE: Final[int] = 0x23
+    BUTTON_EVENT: Final[int] = 0x24
+    ENCODER_EVENT: Final[int] = 0x25
+
+
+VALID_FUNCTION_CODES: Final[bytes] = bytes(
+    (
+        FunctionCode.DISCOVER,
+        FunctionCode.HELLO,
+        FunctionCode.READ_INPUTS,
+        FunctionCode.SET_OUTPUT,
+        FunctionCode.SET_PWM,
+        FunctionCode.INPUT_CHANGE,
+        FunctionCode.OUTPUT_STATE,
+        FunctionCode.PWM_STATE,
+        FunctionCode.ANALOG_SAMPLE,
+        FunctionCode.BUTTON_EVENT,
+        FunctionCode.ENCODER_EVENT,
+    )
+)
+# 256-entry lookup table indexed by the raw function code byte
+_FC_LUT = bytes(1 if i in VALID_FUNCTION_CODES else 0 for i in range(256))
+is_valid_fc = _FC_LUT.__getitem__
 
 
 # Capabilities
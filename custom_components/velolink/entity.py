@@ -0,0 +1,46 @@
+"""Shared helpers for Velolink entity platforms."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Callable, Iterable, List, Tuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.entity import Entity
+
+from .const import ENTITY_ADD_BATCH_S
+
+
+@callback
+def async_entity_batcher(
+    hass: HomeAssistant, async_add_entities: Callable[[List[Entity]], None]
+) -> Tuple[Callable[[Iterable[Entity]], None], Callable[[], None]]:
+    """Return (add, cancel) callables that add platform entities in batches.
+
+    Entities queued within ENTITY_ADD_BATCH_S of the first one go to Home
+    Assistant in one call, so a discovery burst costs one registry pass.
+    """
+    pending: List[Entity] = []
+    flush_handle: asyncio.TimerHandle | None = None
+
+    @callback
+    def flush() -> None:
+        nonlocal flush_handle
+        flush_handle = None
+        entities = pending.copy()
+        pending.clear()
+        async_add_entities(entities)
+
+    @callback
+    def add(entities: Iterable[Entity]) -> None:
+        nonlocal flush_handle
+        pending.extend(entities)
+        if pending and flush_handle is None:
+            flush_handle = hass.loop.call_later(ENTITY_ADD_BATCH_S, flush)
+
+    @callback
+    def cancel() -> None:
+        if flush_handle is not None:
+            flush_handle.cancel()
+
+    return add, cancel
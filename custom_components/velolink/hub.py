@@ -1,28 +1,73 @@
-"""Velolink hub and RS485 transport."""
+"""Velolink hub managing nodes and subscriptions."""
 
 from __future__ import annotations
 
 import asyncio
+import itertools
 import logging
-from dataclasses import dataclass
-from typing import Callable, Dict, Optional, Tuple, List
+import struct
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Iterable, Mapping, Tuple, List
 
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 
 from .const import (
-    GATEWAY_RECONNECT_DELAY_S,
+    DISCOVERY_SETTLE_S,
+    DISCOVERY_TIMEOUT_S,
+    NODE_KIND_INPUT,
+    NODE_KIND_OUTPUT,
+    NODE_KIND_VELOMOTION,
+    NODE_KIND_VELOSWITCH,
     FunctionCode,
-    signal_new_node,
+    is_valid_fc,
     signal_discovery_complete,
 )
+from .transport import (
+    FRAME_HDR,
+    U16,
+    BusId,
+    DemoTransport,
+    SerialTransport,
+    TcpTransport,
+    VelolinkBusConfig,
+    build_frame,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-BusId = str
 Addr = int
 Channel = int
 
+# Node kinds whose channels are configurable (device class, polarity)
+_CHANNEL_TYPE_BY_KIND: Dict[str, str] = {
+    NODE_KIND_INPUT: "in",
+    NODE_KIND_VELOSWITCH: "in",
+    NODE_KIND_VELOMOTION: "in",
+    NODE_KIND_OUTPUT: "out",
+}
+
+# Encoder deltas are signed
+_I8 = struct.Struct("<b")
+
+# Looked up on every received frame, bound once instead of via the class
+_FC_HELLO = FunctionCode.HELLO
+
+# Signal frames carry [ch, value...] right after the 6-byte header, decoded in
+# place to (channel, typed value) without building an intermediate dict
+_SIGNAL_DECODERS: Dict[int, Callable[[bytes], Tuple[Channel, Any]]] = {
+    FunctionCode.INPUT_CHANGE: lambda f: (f[6], bool(f[7])),
+    FunctionCode.OUTPUT_STATE: lambda f: (f[6], bool(f[7])),
+    FunctionCode.PWM_STATE: lambda f: (f[6], f[7]),
+    FunctionCode.ANALOG_SAMPLE: lambda f: (
+        f[6],
+        U16.unpack_from(f, 7)[0] / 1000.0 if f[5] >= 3 else 0.0,
+    ),
+    FunctionCode.BUTTON_EVENT: lambda f: (f[6], bool(f[7])),
+    FunctionCode.ENCODER_EVENT: lambda f: (f[6], _I8.unpack_from(f, 7)[0]),
+}
+
 
 @dataclass
 class VelolinkNode:
@@ -41,434 +86,56 @@ class VelolinkNode:
     serial_number: str | None = None
     name: str | None = None
     suggested_area: str | None = None
+    display_name: str = field(init=False)
+    # Per-platform bitmasks of channels that already have an entity
+    spawned_light: int = field(default=0, compare=False, repr=False)
+    spawned_switch: int = field(default=0, compare=False, repr=False)
+    spawned_sensor: int = field(default=0, compare=False, repr=False)
+    spawned_binary_sensor: int = field(default=0, compare=False, repr=False)
 
+    def __post_init__(self) -> None:
+        """Precompute the default device name used by selectors and entities."""
+        self.display_name = f"Velolink {self.kind.title()} {self.address}"
 
-@dataclass
-class VelolinkBusConfig:
-    """Bus configuration."""
-
-    port: str | None = None
-    host: str | None = None
-    tcp_port: int = 5485
-    baudrate: int = 115200
-    rts_toggle: bool = False
-    name: str = "RS485"
-    transport: str = "serial"
-
-
-# ========== Serial Transport ==========
-class SerialTransport:
-    """Serial RS485 transport."""
-
-    def __init__(
-        self,
-        hass: HomeAssistant,
-        bus_id: BusId,
-        cfg: VelolinkBusConfig,
-        frame_cb: Callable[[BusId, bytes], None],
-    ) -> None:
-        """Initialize serial transport."""
-        self._hass = hass
-        self._bus_id = bus_id
-        self._cfg = cfg
-        self._frame_cb = frame_cb
-        self._serial_transport = None
-        self._serial_protocol = None
-        self._writer_lock = asyncio.Lock()
-
-    async def async_start(self) -> None:
-        """Start serial connection."""
-        # pylint: disable=import-outside-toplevel,import-error
-        import serial
-        import serial_asyncio
-
-        _LOGGER.info(
-            "Starting Serial %s on %s @ %d",
-            self._bus_id,
-            self._cfg.port,
-            self._cfg.baudrate,
-        )
-
-        loop = asyncio.get_running_loop()
-        rs485_settings = None
-
-        if self._cfg.rts_toggle:
-            try:
-                rs485_settings = serial.rs485.RS485Settings(
-                    rts_level_for_tx=True, rts_level_for_rx=False
-                )
-            except Exception:  # pylint: disable=broad-exception-caught
-                _LOGGER.warning("RS485Settings not supported")
-
-        self._serial_transport, self._serial_protocol = (
-            await serial_asyncio.create_serial_connection(
-                loop,
-                lambda: _SerialProtocol(self._hass, self._frame_cb, self._bus_id),
-                url=self._cfg.port,
-                baudrate=self._cfg.baudrate,
-                bytesize=serial.EIGHTBITS,
-                parity=serial.PARITY_NONE,
-                stopbits=serial.STOPBITS_ONE,
-                rs485_mode=rs485_settings,
-            )
-        )
 
-    async def async_stop(self) -> None:
-        """Stop serial connection."""
-        if self._serial_transport:
-            self._serial_transport.close()
-            self._serial_transport = None
-
-    async def async_write_frame(self, frame: bytes) -> None:
-        """Write frame to serial port."""
-        if not self._serial_transport:
-            raise RuntimeError("Serial not started")
-        async with self._writer_lock:
-            self._serial_transport.write(frame)
-            await asyncio.sleep(0)
-
-
-class _SerialProtocol(asyncio.Protocol):
-    """Serial protocol with frame extraction."""
-
-    def __init__(
-        self,
-        hass: HomeAssistant,
-        frame_cb: Callable[[BusId, bytes], None],
-        bus_id: BusId,
-    ) -> None:
-        """Initialize protocol."""
-        self._hass = hass
-        self.frame_cb = frame_cb
-        self.bus_id = bus_id
-        self.buffer = bytearray()
-
-    def data_received(self, data: bytes) -> None:
-        """Handle received data."""
-        self.buffer.extend(data)
-
-        while True:
-            frame = self._extract_one_frame()
-            if not frame:
-                break
-            self._hass.loop.call_soon_threadsafe(self.frame_cb, self.bus_id, frame)
-
-        if len(self.buffer) > 512:
-            _LOGGER.warning("Bus %s: buffer overflow", self.bus_id)
-            self.buffer.clear()
-
-    def _extract_one_frame(self) -> Optional[bytes]:
-        """Extract one frame from buffer."""
-        buf = self.buffer
-        pre_1, pre_2 = 0xAA, 0x55
-
-        while len(buf) >= 8:
-            if buf[0] != pre_1 or buf[1] != pre_2:
-                buf.pop(0)
-                continue
-
-            length = buf[5]
-            total = 6 + length + 2
-
-            if len(buf) < total:
-                return None
-
-            frame = bytes(buf[:total])
-            del buf[:total]
-            return frame
-
-        return None
-
-
-# ========== TCP Transport ==========
-class TcpTransport:
-    """TCP transport for VeloGateway."""
-
-    # pylint: disable=too-many-instance-attributes
-
-    def __init__(
-        self,
-        hass: HomeAssistant,
-        bus_id: BusId,
-        cfg: VelolinkBusConfig,
-        frame_cb: Callable[[BusId, bytes], None],
-    ) -> None:
-        """Initialize TCP transport."""
-        self._hass = hass
-        self._bus_id = bus_id
-        self._cfg = cfg
-        self._frame_cb = frame_cb
-        self._reader: asyncio.StreamReader | None = None
-        self._writer: asyncio.StreamWriter | None = None
-        self._read_task: asyncio.Task | None = None
-        self._running = False
-        self._writer_lock = asyncio.Lock()
-
-    async def async_start(self) -> None:
-        """Start TCP connection."""
-        self._running = True
-        self._read_task = asyncio.create_task(self._reconnect_loop())
-
-    async def async_stop(self) -> None:
-        """Stop TCP connection."""
-        self._running = False
-        if self._read_task:
-            self._read_task.cancel()
-        if self._writer:
-            self._writer.close()
-            await self._writer.wait_closed()
-
-    async def _reconnect_loop(self) -> None:
-        """Auto-reconnect loop."""
-        while self._running:
-            try:
-                await self._connect()
-                await self._read_loop()
-            except asyncio.CancelledError:
-                break
-            except Exception as err:  # pylint: disable=broad-exception-caught
-                _LOGGER.warning(
-                    "TCP %s disconnected: %s, reconnecting in %ds",
-                    self._bus_id,
-                    err,
-                    GATEWAY_RECONNECT_DELAY_S,
-                )
-                await asyncio.sleep(GATEWAY_RECONNECT_DELAY_S)
-
-    async def _connect(self) -> None:
-        """Connect to gateway."""
-        _LOGGER.info(
-            "Connecting to VeloGateway %s:%d (bus=%s)",
-            self._cfg.host,
-            self._cfg.tcp_port,
-            self._bus_id,
-        )
-
-        self._reader, self._writer = await asyncio.open_connection(
-            self._cfg.host, self._cfg.tcp_port
-        )
-
-        _LOGGER.info("Connected to VeloGateway %s", self._bus_id)
-
-    async def _read_loop(self) -> None:
-        """Read loop for TCP packets."""
-        buffer = bytearray()
-
-        while self._running:
-            data = await self._reader.read(1024)
-            if not data:
-                raise ConnectionError("TCP connection closed")
-
-            buffer.extend(data)
-
-            while True:
-                packet = self._extract_tcp_packet(buffer)
-                if not packet:
-                    break
-
-                # Packet: [MAGIC(2)|VER(1)|BUS(1)|LEN(2)|RS485|CRC(2)]
-                frame_len = packet[4] | (packet[5] << 8)
-                rs485_frame = packet[6 : 6 + frame_len]
-
-                self._hass.loop.call_soon_threadsafe(
-                    self._frame_cb, self._bus_id, rs485_frame
-                )
-
-    def _extract_tcp_packet(self, buffer: bytearray) -> Optional[bytes]:
-        """Extract TCP packet."""
-        magic_1, magic_2 = 0x56, 0x4C
-        min_len = 8
-
-        while len(buffer) >= min_len:
-            if buffer[0] != magic_1 or buffer[1] != magic_2:
-                buffer.pop(0)
-                continue
-
-            frame_len = buffer[4] | (buffer[5] << 8)
-            total_len = 6 + frame_len + 2
-
-            if len(buffer) < total_len:
-                return None
-
-            packet = bytes(buffer[:total_len])
-            del buffer[:total_len]
-            return packet
-
-        return None
-
-    async def async_write_frame(self, frame: bytes) -> None:
-        """Write frame over TCP."""
-        if not self._writer:
-            raise RuntimeError("TCP not connected")
-
-        async with self._writer_lock:
-            magic = bytes([0x56, 0x4C])
-            version = bytes([0x01])
-            bus_byte = bytes([0x01 if self._bus_id == "bus1" else 0x02])
-            length = len(frame).to_bytes(2, "little")
-
-            packet_body = magic + version + bus_byte + length + frame
-            crc = VelolinkHub._crc16_value(packet_body)  # Use static method
-            packet = packet_body + crc.to_bytes(2, "little")
-
-            self._writer.write(packet)
-            await self._writer.drain()
-
-    def _crc16(self, data: bytes) -> int:
-        """Calculate CRC16."""
-        crc = 0xFFFF
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
-        return crc
-
-
-# ========== Demo Transport ==========
-class DemoTransport:
-    """Demo transport for testing without hardware."""
-
-    def __init__(
-        self,
-        hass: HomeAssistant,
-        bus_id: BusId,
-        cfg: VelolinkBusConfig,
-        frame_cb: Callable[[BusId, bytes], None],
-    ) -> None:
-        """Initialize demo transport."""
-        self._hass = hass
-        self._bus_id = bus_id
-        self._frame_cb = frame_cb
-        self._running = False
-        self._simulator_task: asyncio.Task | None = None
-
-    async def async_start(self) -> None:
-        """Start demo simulation."""
-        _LOGGER.info("Starting Demo %s", self._bus_id)
-        self._running = True
-        self._simulator_task = asyncio.create_task(self._simulation_loop())
-
-    async def async_stop(self) -> None:
-        """Stop demo simulation."""
-        self._running = False
-        if self._simulator_task:
-            self._simulator_task.cancel()
-            try:
-                await self._simulator_task
-            except asyncio.CancelledError:
-                pass
-
-    async def async_write_frame(self, frame: bytes) -> None:
-        """Pretend to write a frame."""
-        func = frame[3]
-        _LOGGER.debug(
-            "Demo %s: Received command to send func=0x%02X", self._bus_id, func
-        )
-
-        if func == FunctionCode.SET_OUTPUT:
-            addr = frame[2]
-            ch = frame[6]
-            val = frame[7]
-            resp_payload = bytes([ch, val])
-            resp_frame = VelolinkHub._build_frame(
-                addr=addr, func=FunctionCode.OUTPUT_STATE, payload=resp_payload
-            )
-            self._hass.loop.call_soon_threadsafe(
-                self._frame_cb, self._bus_id, resp_frame
-            )
-        elif func == FunctionCode.SET_PWM:
-            addr = frame[2]
-            ch = frame[6]
-            val = frame[7]
-            resp_payload = bytes([ch, val])
-            resp_frame = VelolinkHub._build_frame(
-                addr=addr, func=FunctionCode.PWM_STATE, payload=resp_payload
-            )
-            self._hass.loop.call_soon_threadsafe(
-                self._frame_cb, self._bus_id, resp_frame
-            )
-
-    async def _simulation_loop(self) -> None:
-        """Main simulation loop."""
-        # FIX: Zwiększono opóźnienie, aby uniknąć race condition
-        _LOGGER.info(
-            "Demo %s: Simulation loop started, waiting before discovery...",
-            self._bus_id,
-        )
-        await asyncio.sleep(5)  # Zmieniono z 2 na 5 sekund
-        await self._simulate_discovery()
-        asyncio.create_task(self._simulate_input_changes())
-        asyncio.create_task(self._simulate_analog_changes())
-
-    async def _simulate_discovery(self):
-        """Simulate device discovery by sending HELLO frames."""
-        _LOGGER.info("Demo %s: Simulating device discovery", self._bus_id)
-        demo_devices = [
-            {"addr": 5, "kind": "input", "channels": 4, "model": "IO-INPUT-DEMO"},
-            {"addr": 10, "kind": "output", "channels": 2, "model": "IO-OUTPUT-DEMO"},
-            {"addr": 15, "kind": "pwm", "channels": 1, "model": "IO-PWM-DEMO"},
-            {"addr": 20, "kind": "analog", "channels": 1, "model": "IO-ANALOG-DEMO"},
-            {
-                "addr": 25,
-                "kind": "veloswitch",
-                "channels": 1,
-                "model": "VELOSWITCH-DEMO",
-            },
-        ]
-        for dev in demo_devices:
-            kind_map = {
-                "input": 0x00,
-                "output": 0x01,
-                "pwm": 0x02,
-                "analog": 0x03,
-                "veloswitch": 0x0A,
-            }
-            kind_code = kind_map.get(dev["kind"], 0xFF)
-            payload = bytes(
-                [kind_code, dev["channels"], 0x00, 1, 0, 1, 0, 1, len(dev["model"])]
-            ) + dev["model"].encode("ascii")
-            frame = VelolinkHub._build_frame(
-                addr=dev["addr"], func=FunctionCode.HELLO, payload=payload
-            )
-            # FIX: Dodano logowanie, aby śledzić wysyłane ramki
-            _LOGGER.info(
-                "Demo %s: Sending HELLO frame for device at address %d",
-                self._bus_id,
-                dev["addr"],
-            )
-            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
-            await asyncio.sleep(0.5)
-
-    async def _simulate_input_changes(self):
-        """Simulate binary sensor state changes."""
-        while self._running:
-            await asyncio.sleep(10)
-            payload = bytes([0, 1])
-            frame = VelolinkHub._build_frame(
-                addr=5, func=FunctionCode.INPUT_CHANGE, payload=payload
-            )
-            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
-            await asyncio.sleep(5)
-            payload = bytes([0, 0])
-            frame = VelolinkHub._build_frame(
-                addr=5, func=FunctionCode.INPUT_CHANGE, payload=payload
-            )
-            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
-
-    async def _simulate_analog_changes(self):
-        """Simulate analog sensor value changes."""
-        value = 1.0
-        while self._running:
-            await asyncio.sleep(5)
-            value += 0.1
-            if value > 3.3:
-                value = 1.0
-            val_mv = int(value * 1000)
-            payload = bytes([0, val_mv & 0xFF, (val_mv >> 8) & 0xFF])
-            frame = VelolinkHub._build_frame(
-                addr=20, func=FunctionCode.ANALOG_SAMPLE, payload=payload
-            )
-            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
+@dataclass
+class NodeSubs:
+    """Subscriber callbacks of one node, indexed by channel and keyed by id."""
+
+    input: List[Dict[int, Callable[[bool], None]]] = field(default_factory=list)
+    output: List[Dict[int, Callable[[bool], None]]] = field(default_factory=list)
+    pwm: List[Dict[int, Callable[[int], None]]] = field(default_factory=list)
+    analog: List[Dict[int, Callable[[float], None]]] = field(default_factory=list)
+    button: List[Dict[int, Callable[[bool], None]]] = field(default_factory=list)
+    encoder: List[Dict[int, Callable[[int], None]]] = field(default_factory=list)
+    by_func: Dict[int, List[Dict[int, Callable]]] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        """Map signal function codes to their buckets."""
+        self.by_func = {
+            FunctionCode.INPUT_CHANGE: self.input,
+            FunctionCode.OUTPUT_STATE: self.output,
+            FunctionCode.PWM_STATE: self.pwm,
+            FunctionCode.ANALOG_SAMPLE: self.analog,
+            FunctionCode.BUTTON_EVENT: self.button,
+            FunctionCode.ENCODER_EVENT: self.encoder,
+        }
+
+    def ensure_channels(self, channels: int) -> None:
+        """Grow every bucket to at least the given channel count."""
+        missing = channels - len(self.input)
+        if missing <= 0:
+            return
+        # Existing dicts are kept, unsubscribe closures hold references to them
+        for bucket in (
+            self.input,
+            self.output,
+            self.pwm,
+            self.analog,
+            self.button,
+            self.encoder,
+        ):
+            bucket.extend({} for _ in range(missing))
 
 
 # ========== Main Hub ==========
@@ -489,25 +156,25 @@ class VelolinkHub:
         ] = {}
         self._nodes: Dict[Tuple[BusId, Addr], VelolinkNode] = {}
 
-        # Subscriptions
-        self._subs_input: Dict[
-            Tuple[BusId, Addr, Channel], List[Callable[[bool], None]]
-        ] = {}
-        self._subs_output: Dict[
-            Tuple[BusId, Addr, Channel], List[Callable[[bool], None]]
-        ] = {}
-        self._subs_pwm: Dict[
-            Tuple[BusId, Addr, Channel], List[Callable[[int], None]]
-        ] = {}
-        self._subs_analog: Dict[
-            Tuple[BusId, Addr, Channel], List[Callable[[float], None]]
-        ] = {}
-        self._subs_button: Dict[
-            Tuple[BusId, Addr, Channel], List[Callable[[bool], None]]
-        ] = {}
-        self._subs_encoder: Dict[
-            Tuple[BusId, Addr, Channel], List[Callable[[int], None]]
-        ] = {}
+        # Bus choices for the options flow scan step, fixed for the hub lifetime
+        self.bus_options: Dict[str, str] = {
+            bus_id: f"Magistrala {bus_id.title()}" for bus_id in buses
+        }
+        if len(buses) > 1:
+            self.bus_options["all"] = "Wszystkie magistrale"
+
+        # Options flow selectors, maintained as nodes are registered
+        self._channels_index: Dict[str, Tuple[BusId, Addr, str, Channel, str]] = {}
+        self._device_labels: Dict[str, Tuple[BusId, Addr, str]] = {}
+
+        # Subscriptions, per node and indexed by channel on the hot path
+        self._subs: Dict[BusId, Dict[Addr, NodeSubs]] = {}
+        self._sub_ids = itertools.count()
+        # Platform callbacks for newly discovered nodes, by node kind
+        self._node_listeners: Dict[str, List[Callable[[VelolinkNode], None]]] = {}
+
+        # Set whenever a HELLO arrives, used to end discovery once a bus is quiet
+        self._hello_events: Dict[BusId, asyncio.Event] = {}
 
         self._running = False
 
@@ -515,9 +182,9 @@ class VelolinkHub:
         """Start hub."""
         for bus_id, cfg in self._buses_cfg.items():
             if cfg.transport == "serial":
-                transport = SerialTransport(self._hass, bus_id, cfg, self._on_frame)
+                transport = SerialTransport(self._hass, bus_id, cfg, self._on_frames)
             elif cfg.transport == "tcp":
-                transport = TcpTransport(self._hass, bus_id, cfg, self._on_frame)
+                transport = TcpTransport(self._hass, bus_id, cfg, self._on_frames)
             elif cfg.transport == "demo":
                 transport = DemoTransport(self._hass, bus_id, cfg, self._on_frame)
             else:
@@ -539,22 +206,76 @@ class VelolinkHub:
         )
         self._transports.clear()
 
+    def has_bus(self, bus_id: BusId) -> bool:
+        """Return True if the bus is configured on this hub."""
+        return bus_id in self._buses_cfg
+
     async def async_discovery_bus(self, bus_id: BusId) -> None:
         """Discover devices on bus."""
         _LOGGER.info("Discovery on %s", bus_id)
-        frame = VelolinkHub._build_frame(
-            addr=0x00, func=FunctionCode.DISCOVER, payload=b""
-        )
+        frame = build_frame(addr=0x00, func=FunctionCode.DISCOVER, payload=b"")
+        hello = self._hello_events.setdefault(bus_id, asyncio.Event())
+        hello.clear()
         await self._transports[bus_id].async_write_frame(frame)
-        await asyncio.sleep(2.0)
+        await self._async_wait_discovery_settled(hello)
         async_dispatcher_send(
             self._hass, signal_discovery_complete(self._entry_id), bus_id
         )
 
+    @staticmethod
+    async def _async_wait_discovery_settled(hello: asyncio.Event) -> None:
+        """Wait until HELLO replies stop arriving or the discovery timeout ends."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + DISCOVERY_TIMEOUT_S
+        # Give slow nodes the full window to answer first, then stop once quiet
+        settle = DISCOVERY_TIMEOUT_S
+        while (remaining := deadline - loop.time()) > 0:
+            try:
+                await asyncio.wait_for(hello.wait(), timeout=min(settle, remaining))
+            except asyncio.TimeoutError:
+                return
+            hello.clear()
+            settle = DISCOVERY_SETTLE_S
+
     async def async_discovery_all(self) -> None:
         """Discover on all buses."""
-        for bus_id in list(self._transports.keys()):
-            await self.async_discovery_bus(bus_id)
+        await asyncio.gather(
+            *(self.async_discovery_bus(bus_id) for bus_id in list(self._transports))
+        )
+
+    def register_platform(
+        self, kinds: Iterable[str], callback_func: Callable[[VelolinkNode], None]
+    ) -> Callable[[], None]:
+        """Call back a platform for every new node of the given kinds."""
+        kinds = tuple(kinds)
+        for kind in kinds:
+            self._node_listeners.setdefault(kind, []).append(callback_func)
+
+        def unsub() -> None:
+            for kind in kinds:
+                self._node_listeners[kind].remove(callback_func)
+
+        return unsub
+
+    def _node_subs(self, bus_id: BusId, addr: Addr, channels: int) -> NodeSubs:
+        """Return the subscriber table of a node, sized for the given channels."""
+        node_subs = self._subs.setdefault(bus_id, {}).get(addr)
+        if node_subs is None:
+            node_subs = self._subs[bus_id][addr] = NodeSubs()
+        node_subs.ensure_channels(channels)
+        return node_subs
+
+    def _add_sub(
+        self, subs: Dict[int, Callable], callback_func: Callable
+    ) -> Callable[[], None]:
+        """Store a callback under a fresh id and return its O(1) unsubscribe."""
+        sid = next(self._sub_ids)
+        subs[sid] = callback_func
+
+        def unsub() -> None:
+            subs.pop(sid, None)
+
+        return unsub
 
     # Subscribe methods
     def subscribe_input(
@@ -565,15 +286,9 @@ class VelolinkHub:
         callback_func: Callable[[bool], None],
     ) -> Callable[[], None]:
         """Subscribe to input changes."""
-        key = (bus_id, addr, ch)
-        self._subs_input.setdefault(key, []).append(callback_func)
-
-        def unsub() -> None:
-            lst = self._subs_input.get(key, [])
-            if callback_func in lst:
-                lst.remove(callback_func)
-
-        return unsub
+        return self._add_sub(
+            self._node_subs(bus_id, addr, ch + 1).input[ch], callback_func
+        )
 
     def subscribe_output(
         self,
@@ -583,15 +298,9 @@ class VelolinkHub:
         callback_func: Callable[[bool], None],
     ) -> Callable[[], None]:
         """Subscribe to output changes."""
-        key = (bus_id, addr, ch)
-        self._subs_output.setdefault(key, []).append(callback_func)
-
-        def unsub() -> None:
-            lst = self._subs_output.get(key, [])
-            if callback_func in lst:
-                lst.remove(callback_func)
-
-        return unsub
+        return self._add_sub(
+            self._node_subs(bus_id, addr, ch + 1).output[ch], callback_func
+        )
 
     def subscribe_pwm(
         self,
@@ -601,15 +310,9 @@ class VelolinkHub:
         callback_func: Callable[[int], None],
     ) -> Callable[[], None]:
         """Subscribe to PWM changes."""
-        key = (bus_id, addr, ch)
-        self._subs_pwm.setdefault(key, []).append(callback_func)
-
-        def unsub() -> None:
-            lst = self._subs_pwm.get(key, [])
-            if callback_func in lst:
-                lst.remove(callback_func)
-
-        return unsub
+        return self._add_sub(
+            self._node_subs(bus_id, addr, ch + 1).pwm[ch], callback_func
+        )
 
     def subscribe_button(
         self,
@@ -619,15 +322,9 @@ class VelolinkHub:
         callback_func: Callable[[bool], None],
     ) -> Callable[[], None]:
         """Subscribe to button events."""
-        key = (bus_id, addr, ch)
-        self._subs_button.setdefault(key, []).append(callback_func)
-
-        def unsub() -> None:
-            lst = self._subs_button.get(key, [])
-            if callback_func in lst:
-                lst.remove(callback_func)
-
-        return unsub
+        return self._add_sub(
+            self._node_subs(bus_id, addr, ch + 1).button[ch], callback_func
+        )
 
     def subscribe_encoder(
         self,
@@ -637,15 +334,9 @@ class VelolinkHub:
         callback_func: Callable[[int], None],
     ) -> Callable[[], None]:
         """Subscribe to encoder events."""
-        key = (bus_id, addr, ch)
-        self._subs_encoder.setdefault(key, []).append(callback_func)
-
-        def unsub() -> None:
-            lst = self._subs_encoder.get(key, [])
-            if callback_func in lst:
-                lst.remove(callback_func)
-
-        return unsub
+        return self._add_sub(
+            self._node_subs(bus_id, addr, ch + 1).encoder[ch], callback_func
+        )
 
     def subscribe_analog(
         self,
@@ -655,15 +346,9 @@ class VelolinkHub:
         callback_func: Callable[[float], None],
     ) -> Callable[[], None]:
         """Subscribe to analog changes."""
-        key = (bus_id, addr, ch)
-        self._subs_analog.setdefault(key, []).append(callback_func)
-
-        def unsub() -> None:
-            lst = self._subs_analog.get(key, [])
-            if callback_func in lst:
-                lst.remove(callback_func)
-
-        return unsub
+        return self._add_sub(
+            self._node_subs(bus_id, addr, ch + 1).analog[ch], callback_func
+        )
 
     # Commands
     async def async_set_output(
@@ -671,9 +356,7 @@ class VelolinkHub:
     ) -> None:
         """Set output state."""
         payload = bytes([ch & 0xFF, 1 if on else 0])
-        frame = VelolinkHub._build_frame(
-            addr=addr, func=FunctionCode.SET_OUTPUT, payload=payload
-        )
+        frame = build_frame(addr=addr, func=FunctionCode.SET_OUTPUT, payload=payload)
         await self._transports[bus_id].async_write_frame(frame)
 
     async def async_set_pwm(
@@ -682,21 +365,29 @@ class VelolinkHub:
         """Set PWM value."""
         value = max(0, min(255, value))
         payload = bytes([ch & 0xFF, value & 0xFF])
-        frame = VelolinkHub._build_frame(
-            addr=addr, func=FunctionCode.SET_PWM, payload=payload
-        )
+        frame = build_frame(addr=addr, func=FunctionCode.SET_PWM, payload=payload)
         await self._transports[bus_id].async_write_frame(frame)
 
     @callback
+    def _on_frames(self, bus_id: BusId, frames: List[bytes]) -> None:
+        """Handle a batch of frames received in one read."""
+        for frame in frames:
+            self._on_frame(bus_id, frame)
+
     def _on_frame(self, bus_id: BusId, frame: bytes) -> None:
         """Handle received frame."""
         try:
-            parsed = self._parse_frame(frame)
+            self._validate_frame(frame)
+            func = frame[3]
+            if func == _FC_HELLO:
+                parsed = self._parse_hello(frame)
+            else:
+                func, addr, ch, value = self._parse_signal(frame)
         except Exception as err:  # pylint: disable=broad-exception-caught
             _LOGGER.debug("Parse error on %s: %s", bus_id, err)
             return
 
-        if parsed["type"] == "HELLO":
+        if func == _FC_HELLO:
             node = VelolinkNode(
                 bus_id=bus_id,
                 address=parsed["addr"],
@@ -710,228 +401,211 @@ class VelolinkHub:
                 suggested_area=parsed.get("area"),
             )
             self._register_node(node)
+            if (hello := self._hello_events.get(bus_id)) is not None:
+                hello.set()
+            return
 
-        elif parsed["type"] == "INPUT_CHANGE":
-            self._emit(
-                self._subs_input,
-                (bus_id, parsed["addr"], parsed["ch"]),
-                bool(parsed["value"]),
-            )
-        elif parsed["type"] == "OUTPUT_STATE":
-            self._emit(
-                self._subs_output,
-                (bus_id, parsed["addr"], parsed["ch"]),
-                bool(parsed["value"]),
-            )
-        elif parsed["type"] == "PWM_STATE":
-            self._emit(
-                self._subs_pwm,
-                (bus_id, parsed["addr"], parsed["ch"]),
-                int(parsed["value"]),
-            )
-        elif parsed["type"] == "ANALOG_SAMPLE":
-            self._emit(
-                self._subs_analog,
-                (bus_id, parsed["addr"], parsed["ch"]),
-                float(parsed["value"]),
-            )
-        elif parsed["type"] == "BUTTON_EVENT":
-            self._emit(
-                self._subs_button,
-                (bus_id, parsed["addr"], parsed["ch"]),
-                bool(parsed["pressed"]),
-            )
-        elif parsed["type"] == "ENCODER_EVENT":
-            self._emit(
-                self._subs_encoder,
-                (bus_id, parsed["addr"], parsed["ch"]),
-                int(parsed["delta"]),
-            )
+        node_subs = self._subs.get(bus_id, {}).get(addr)
+        if node_subs is not None:
+            self._emit(node_subs.by_func[func], ch, value)
 
-    def _emit(self, bucket: Dict[Tuple, List[Callable]], key: Tuple, value) -> None:
+    @staticmethod
+    def _emit(by_channel: List[Dict[int, Callable]], ch: Channel, value) -> None:
         """Emit to subscribers."""
-        for callback_func in bucket.get(key, []):
+        if ch >= len(by_channel):
+            return
+        # Snapshot, a callback may unsubscribe while we iterate
+        for callback_func in tuple(by_channel[ch].values()):
             try:
                 callback_func(value)
             except Exception:  # pylint: disable=broad-exception-caught
-                _LOGGER.exception("Callback error for %s", key)
+                _LOGGER.exception("Callback error for channel %s", ch)
 
     def _register_node(self, node: VelolinkNode) -> None:
         """Register discovered node."""
         key = (node.bus_id, node.address)
+        self._node_subs(node.bus_id, node.address, node.channels)
         if key in self._nodes:
+            old = self._nodes[key]
+            node.spawned_light = old.spawned_light
+            node.spawned_switch = old.spawned_switch
+            node.spawned_sensor = old.spawned_sensor
+            node.spawned_binary_sensor = old.spawned_binary_sensor
             self._nodes[key] = node
+            # Repeat HELLOs normally describe the same node, its index keys and
+            # labels depend only on kind and channel count
+            if (old.kind, old.channels) != (node.kind, node.channels):
+                self._unindex_node(old)
+                self._index_node(node)
+                self._sort_indexes()
             _LOGGER.debug("Updated node: %s", node)
             return
 
         self._nodes[key] = node
+        self._index_node(node)
+        self._sort_indexes()
         # FIX: Dodano logowanie, aby śledzić rejestrację węzłów
         _LOGGER.info(
-            "New node: %s @ %s:%d. Sending signal.",
+            "New node: %s @ %s:%d. Notifying platforms.",
             node.kind,
             node.bus_id,
             node.address,
         )
-        async_dispatcher_send(self._hass, signal_new_node(self._entry_id), node)
+        for listener in tuple(self._node_listeners.get(node.kind, ())):
+            try:
+                listener(node)
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.exception("Platform callback error for %s", node)
+
+    def _index_node(self, node: VelolinkNode) -> None:
+        """Add node channels and device label to the selector indexes."""
+        bus_id, addr = node.bus_id, node.address
+        self._device_labels[f"{bus_id}-{addr}"] = (bus_id, addr, node.display_name)
+
+        ch_type = _CHANNEL_TYPE_BY_KIND.get(node.kind)
+        if ch_type is None:
+            return
+        label = ch_type.upper()
+        self._channels_index.update(
+            {
+                f"{bus_id}-{addr}-{ch_type}-{ch}": (
+                    bus_id,
+                    addr,
+                    ch_type,
+                    ch,
+                    f"({label} {ch}) na {bus_id}",
+                )
+                for ch in range(node.channels)
+            }
+        )
+
+    def _unindex_node(self, node: VelolinkNode) -> None:
+        """Remove node channels and device label from the selector indexes."""
+        bus_id, addr = node.bus_id, node.address
+        self._device_labels.pop(f"{bus_id}-{addr}", None)
+
+        ch_type = _CHANNEL_TYPE_BY_KIND.get(node.kind)
+        if ch_type is None:
+            return
+        for ch in range(node.channels):
+            self._channels_index.pop(f"{bus_id}-{addr}-{ch_type}-{ch}", None)
+
+    def _sort_indexes(self) -> None:
+        """Keep selector indexes ordered by bus, address and channel.
+
+        Nodes are registered rarely while the options flow reads the indexes
+        on every render, so ordering is paid here once instead of per render.
+        """
+        self._channels_index = dict(
+            sorted(self._channels_index.items(), key=lambda item: item[1][:4])
+        )
+        self._device_labels = dict(
+            sorted(self._device_labels.items(), key=lambda item: item[1][:2])
+        )
+
+    @property
+    def channels_index(self) -> Mapping[str, Tuple[BusId, Addr, str, Channel, str]]:
+        """Configurable channels by selector key, ordered by bus/address/channel."""
+        return MappingProxyType(self._channels_index)
+
+    @property
+    def device_labels(self) -> Mapping[str, Tuple[BusId, Addr, str]]:
+        """Known devices by selector key with their default name, ordered."""
+        return MappingProxyType(self._device_labels)
 
     def get_node(self, bus_id: BusId, addr: Addr) -> VelolinkNode | None:
         """Get node by address."""
         return self._nodes.get((bus_id, addr))
 
-    @staticmethod
-    def _build_frame(addr: int, func: int, payload: bytes) -> bytes:
-        """Build RS485 frame."""
-        pre = bytes([0xAA, 0x55])
-        seq = 0
-        length = len(payload)
-        body = bytes([addr & 0xFF, func & 0xFF, seq & 0xFF, length & 0xFF]) + payload
-        crc = VelolinkHub._crc16_value(body)
-        return pre + body + crc.to_bytes(2, "little")
+    def get_channel_type(self, bus_id: BusId, addr: Addr) -> str | None:
+        """Return the configurable channel type ("in"/"out") of a known node."""
+        node = self._nodes.get((bus_id, addr))
+        return None if node is None else _CHANNEL_TYPE_BY_KIND.get(node.kind)
 
     @staticmethod
-    def _crc16_value(data: bytes) -> int:
-        """Calculate CRC16."""
-        crc = 0xFFFF
-        for byte in data:
-            crc ^= byte
-            for _ in range(8):
-                crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
-        return crc
-
-    def _parse_frame(self, frame: bytes) -> dict:
-        """Parse RS485 frame."""
-        # pylint: disable=too-many-locals,too-many-branches
-        # pylint: disable=too-many-statements,too-many-return-statements
-        if len(frame) < 8 or frame[0] != 0xAA or frame[1] != 0x55:
+    def _validate_frame(frame: bytes) -> None:
+        """Check RS485 frame preamble, length and function code.
+
+        The CRC is verified by the transports while extracting frames.
+        """
+        size = len(frame)
+        if size < 8:
+            raise ValueError("bad preamble")
+        pre1, pre2, _addr, func, _seq, length = FRAME_HDR.unpack_from(frame)
+        if pre1 != 0xAA or pre2 != 0x55:
             raise ValueError("bad preamble")
 
-        length = frame[5]
-        expected = 6 + length + 2
-        if len(frame) != expected:
+        if size != 6 + length + 2:
             raise ValueError("length mismatch")
 
-        body = frame[2:-2]
-        crc_recv = frame[-2] | (frame[-1] << 8)
-        crc_calc = VelolinkHub._crc16_value(body)
-        if crc_recv != crc_calc:
-            raise ValueError("CRC error")
+        if not is_valid_fc(func):
+            raise ValueError(f"unknown func: {func:02X}")
 
+    @staticmethod
+    def _parse_hello(frame: bytes) -> dict:
+        """Parse extended HELLO frame."""
+        # pylint: disable=too-many-locals
         addr = frame[2]
-        func = frame[3]
-        payload = frame[6 : 6 + length]
-
-        # HELLO Extended
-        if func == FunctionCode.HELLO:
-            if len(payload) < 8:
-                raise ValueError("HELLO too short")
-
-            kind_code = payload[0]
-            kind_map = {
-                0x00: "input",
-                0x01: "output",
-                0x02: "pwm",
-                0x03: "analog",
-                0x0A: "veloswitch",
-                0x0B: "velodimmer",
-                0x0C: "velomotion",
-                0x0D: "velosensor",
-            }
-            kind = kind_map.get(kind_code, "unknown")
-            channels = payload[1]
-            capabilities = payload[2]
-            hw_ver = f"{payload[3]}.{payload[4]}"
-            sw_ver = f"{payload[5]}.{payload[6]}.{payload[7]}"
-
-            offset = 8
-            model, serial, area = None, None, None
-
-            if offset < len(payload):
-                model_len = payload[offset]
-                offset += 1
-                if offset + model_len <= len(payload):
-                    model = payload[offset : offset + model_len].decode(
-                        "ascii", errors="ignore"
-                    )
-                    offset += model_len
-
-            if offset < len(payload):
-                serial_len = payload[offset]
-                offset += 1
-                if offset + serial_len <= len(payload):
-                    serial = payload[offset : offset + serial_len].decode(
-                        "ascii", errors="ignore"
-                    )
-                    offset += serial_len
-
-            if offset < len(payload):
-                area_len = payload[offset]
-                offset += 1
-                if offset + area_len <= len(payload):
-                    area = payload[offset : offset + area_len].decode(
-                        "utf-8", errors="ignore"
-                    )
-
-            return {
-                "type": "HELLO",
-                "addr": addr,
-                "kind": kind,
-                "channels": channels,
-                "capabilities": capabilities,
-                "hw_version": hw_ver,
-                "sw_version": sw_ver,
-                "model": model,
-                "serial_number": serial,
-                "area": area,
-            }
-
-        if func == FunctionCode.INPUT_CHANGE:
-            return {
-                "type": "INPUT_CHANGE",
-                "addr": addr,
-                "ch": payload[0],
-                "value": payload[1],
-            }
-
-        if func == FunctionCode.OUTPUT_STATE:
-            return {
-                "type": "OUTPUT_STATE",
-                "addr": addr,
-                "ch": payload[0],
-                "value": payload[1],
-            }
-
-        if func == FunctionCode.PWM_STATE:
-            return {
-                "type": "PWM_STATE",
-                "addr": addr,
-                "ch": payload[0],
-                "value": payload[1],
-            }
-
-        if func == FunctionCode.ANALOG_SAMPLE:
-            val = payload[1] | (payload[2] << 8) if len(payload) >= 3 else 0
-            return {
-                "type": "ANALOG_SAMPLE",
-                "addr": addr,
-                "ch": payload[0],
-                "value": val / 1000.0,
-            }
+        payload = frame[6 : 6 + frame[5]]
+        if len(payload) < 8:
+            raise ValueError("HELLO too short")
+
+        kind_code = payload[0]
+        kind_map = {
+            0x00: "input",
+            0x01: "output",
+            0x02: "pwm",
+            0x03: "analog",
+            0x0A: "veloswitch",
+            0x0B: "velodimmer",
+            0x0C: "velomotion",
+            0x0D: "velosensor",
+        }
+        kind = kind_map.get(kind_code, "unknown")
+        channels = payload[1]
+        capabilities = payload[2]
+        hw_ver = f"{payload[3]}.{payload[4]}"
+        sw_ver = f"{payload[5]}.{payload[6]}.{payload[7]}"
+
+        # Optional length-prefixed model, serial number and area; stop at the
+        # first truncated field
+        fields: List[bytes | None] = [None, None, None]
+        offset = 8
+        for idx in range(3):
+            if offset >= len(payload):
+                break
+            size = payload[offset]
+            offset += 1
+            if offset + size > len(payload):
+                break
+            fields[idx] = payload[offset : offset + size]
+            offset += size
 
-        if func == FunctionCode.BUTTON_EVENT:
-            return {
-                "type": "BUTTON_EVENT",
-                "addr": addr,
-                "ch": payload[0],
-                "pressed": bool(payload[1]),
-            }
+        model, serial, area = (
+            None if raw is None else raw.decode(encoding, errors="ignore")
+            for raw, encoding in zip(fields, ("ascii", "ascii", "utf-8"))
+        )
 
-        if func == FunctionCode.ENCODER_EVENT:
-            delta = int.from_bytes([payload[1]], "little", signed=True)
-            return {
-                "type": "ENCODER_EVENT",
-                "addr": addr,
-                "ch": payload[0],
-                "delta": delta,
-            }
+        return {
+            "type": "HELLO",
+            "addr": addr,
+            "kind": kind,
+            "channels": channels,
+            "capabilities": capabilities,
+            "hw_version": hw_ver,
+            "sw_version": sw_ver,
+            "model": model,
+            "serial_number": serial,
+            "area": area,
+        }
 
-        raise ValueError(f"unknown func: {func:02X}")
+    @staticmethod
+    def _parse_signal(frame: bytes) -> Tuple[int, Addr, Channel, Any]:
+        """Parse a signal frame into (func, addr, channel, value)."""
+        if frame[5] < 2:
+            raise ValueError("signal too short")
+        func = frame[3]
+        if (decode := _SIGNAL_DECODERS.get(func)) is None:
+            raise ValueError(f"unknown func: {func:02X}")
+        ch, value = decode(frame)
+        return func, frame[2], ch, value
@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from typing import Any, Callable, Final
 
 from homeassistant.core import HomeAssistant, callback
@@ -20,9 +22,9 @@ from .const import (
     DOMAIN,
     NODE_KIND_PWM,
     NODE_KIND_VELODIMMER,
-    signal_new_node,
     signal_device_name_updated,
 )
+from .entity import async_entity_batcher
 from .hub import VelolinkHub, VelolinkNode
 from .storage import VelolinkStorage
 
@@ -30,6 +32,13 @@ _LOGGER = logging.getLogger(__name__)
 
 PARALLEL_UPDATES: Final[int] = 0
 
+_LIGHT_NODE_KINDS: Final[frozenset[str]] = frozenset(
+    (NODE_KIND_PWM, NODE_KIND_VELODIMMER)
+)
+
+# Encoder ticks arriving within this window are merged into one PWM write
+_ENCODER_COALESCE_S: Final[float] = 0.02
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
@@ -37,42 +46,28 @@ async def async_setup_entry(
     """Set up lights."""
     hub: VelolinkHub = hass.data[DOMAIN][entry.entry_id]
     storage: VelolinkStorage = hass.data[DOMAIN][f"{entry.entry_id}_storage"]
-    created: set[str] = set()
+
+    add_entities, cancel_add = async_entity_batcher(hass, async_add_entities)
 
     @callback
     def _handle_new_node(node: VelolinkNode) -> None:
-        if node.kind == NODE_KIND_PWM:
-            entities = []
-            for ch in range(node.channels):
-                uid = f"{node.bus_id}-{node.address}-pwm-{ch}"
-                if uid in created:
-                    continue
-                created.add(uid)
-                entities.append(
-                    VelolinkLightEntity(hass, entry.entry_id, hub, storage, node, ch)
-                )
-
-            if entities:
-                async_add_entities(entities)
-
-        elif node.kind == NODE_KIND_VELODIMMER:
-            entities = []
-            for ch in range(node.channels):
-                uid = f"{node.bus_id}-{node.address}-dimmer-{ch}"
-                if uid in created:
-                    continue
-                created.add(uid)
-                entities.append(
-                    VeloDimmerEntity(hass, entry.entry_id, hub, storage, node, ch)
-                )
-
-            if entities:
-                async_add_entities(entities)
-
-    unsub = async_dispatcher_connect(
-        hass, signal_new_node(entry.entry_id), _handle_new_node
-    )
-    entry.async_on_unload(unsub)
+        entity_cls = (
+            VeloDimmerEntity
+            if node.kind == NODE_KIND_VELODIMMER
+            else VelolinkLightEntity
+        )
+        entities = []
+        mask = node.spawned_light
+        for ch in range(node.channels):
+            if mask & (1 << ch):
+                continue
+            mask |= 1 << ch
+            entities.append(entity_cls(hass, entry.entry_id, hub, storage, node, ch))
+        node.spawned_light = mask
+        add_entities(entities)
+
+    entry.async_on_unload(cancel_add)
+    entry.async_on_unload(hub.register_platform(_LIGHT_NODE_KINDS, _handle_new_node))
 
 
 class VelolinkLightEntity(LightEntity):
@@ -96,25 +91,35 @@ class VelolinkLightEntity(LightEntity):
         self._storage = storage
         self._node = node
         self._ch = ch
+        # Bound once, command paths skip the hub attribute lookup
+        self._set_pwm = hub.async_set_pwm
         self._is_on = False
         self._brightness = 255
         self._unsub: Callable[[], None] | None = None
         self._unsub_name_update: Callable[[], None] | None = None
 
-    @property
-    def unique_id(self) -> str:
-        """Return unique ID."""
-        return f"{self._node.bus_id}-{self._node.address}-pwm-{self._ch}"
+        self._attr_unique_id = f"{node.bus_id}-{node.address}-pwm-{ch}"
+        self._refresh_names()
 
-    @property
-    def name(self) -> str:
-        """Return name."""
+    def _refresh_names(self) -> None:
+        """Cache name and device info, rebuilt only when the device is renamed."""
         custom_name = self._storage.get_device_name(
             self._node.bus_id, self._node.address
         )
         if custom_name:
-            return f"{custom_name} PWM {self._ch}"
-        return f"Velolink PWM {self._node.address}:{self._ch}"
+            self._attr_name = f"{custom_name} PWM {self._ch}"
+        else:
+            self._attr_name = f"Velolink PWM {self._node.address}:{self._ch}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{self._node.bus_id}-{self._node.address}")},
+            name=custom_name or self._node.display_name,
+            manufacturer=self._node.manufacturer,
+            model=self._node.model or "IO-PWM",
+            sw_version=self._node.sw_version,
+            hw_version=self._node.hw_version,
+            suggested_area=self._node.suggested_area,
+        )
 
     @property
     def supported_color_modes(self) -> set[ColorMode]:
@@ -136,28 +141,6 @@ class VelolinkLightEntity(LightEntity):
         """Return brightness."""
         return self._brightness if self._is_on else None
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        custom_name = self._storage.get_device_name(
-            self._node.bus_id, self._node.address
-        )
-
-        identifier = (DOMAIN, f"{self._node.bus_id}-{self._node.address}")
-        device_name = (
-            custom_name or f"Velolink {self._node.kind.title()} {self._node.address}"
-        )
-
-        return DeviceInfo(
-            identifiers={identifier},
-            name=device_name,
-            manufacturer=self._node.manufacturer,
-            model=self._node.model or "IO-PWM",
-            sw_version=self._node.sw_version,
-            hw_version=self._node.hw_version,
-            suggested_area=self._node.suggested_area,
-        )
-
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on light."""
         if ATTR_BRIGHTNESS in kwargs:
@@ -166,27 +149,31 @@ class VelolinkLightEntity(LightEntity):
         if not self._is_on and ATTR_BRIGHTNESS not in kwargs:
             self._brightness = 255
 
-        await self._hub.async_set_pwm(
+        await self._set_pwm(
             self._node.bus_id, self._node.address, self._ch, self._brightness
         )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off light."""
-        await self._hub.async_set_pwm(
-            self._node.bus_id, self._node.address, self._ch, 0
-        )
+        await self._set_pwm(self._node.bus_id, self._node.address, self._ch, 0)
+
+    @callback
+    def _push_pwm(self, val: int) -> None:
+        """Apply a PWM state from the hub."""
+        val = 0 if val < 0 else 255 if val > 255 else val
+        is_on = val > 0
+        # PWM 0 is off, the last non-zero brightness is kept for the next turn-on
+        brightness = val if is_on else self._brightness
+        if brightness == self._brightness and is_on == self._is_on:
+            return
+        self._brightness = brightness
+        self._is_on = is_on
+        self.async_write_ha_state()
 
     async def async_added_to_hass(self) -> None:
         """Handle entity added."""
-
-        @callback
-        def _on_change(val: int) -> None:
-            self._brightness = max(1, min(255, val))
-            self._is_on = self._brightness > 0
-            self.async_write_ha_state()
-
         self._unsub = self._hub.subscribe_pwm(
-            self._node.bus_id, self._node.address, self._ch, _on_change
+            self._node.bus_id, self._node.address, self._ch, self._push_pwm
         )
 
         @callback
@@ -195,6 +182,7 @@ class VelolinkLightEntity(LightEntity):
                 data["bus_id"] == self._node.bus_id
                 and data["address"] == self._node.address
             ):
+                self._refresh_names()
                 self.async_write_ha_state()
 
         self._unsub_name_update = async_dispatcher_connect(
@@ -232,30 +220,40 @@ class VeloDimmerEntity(LightEntity):
         self._storage = storage
         self._node = node
         self._ch = ch
+        self._set_pwm = hub.async_set_pwm
 
         self._is_on = False
         self._brightness = 255
-        self._last_encoder_time = None
+        # Epoch seconds, formatted only when attributes are rendered
+        self._last_encoder_ts: float | None = None
+        self._pending_delta = 0
+        self._attrs_base = {"bus": node.bus_id, "address": node.address, "channel": ch}
+        self._flush_handle: asyncio.TimerHandle | None = None
 
         self._unsub_button: Callable[[], None] | None = None
         self._unsub_encoder: Callable[[], None] | None = None
         self._unsub_pwm: Callable[[], None] | None = None
         self._unsub_name_update: Callable[[], None] | None = None
 
-    @property
-    def unique_id(self) -> str:
-        """Return unique ID."""
-        return f"{self._node.bus_id}-{self._node.address}-dimmer-{self._ch}"
+        self._attr_unique_id = f"{node.bus_id}-{node.address}-dimmer-{ch}"
+        self._refresh_names()
 
-    @property
-    def name(self) -> str:
-        """Return name."""
+    def _refresh_names(self) -> None:
+        """Cache name and device info, rebuilt only when the device is renamed."""
         custom_name = self._storage.get_device_name(
             self._node.bus_id, self._node.address
         )
-        if custom_name:
-            return custom_name
-        return f"VeloDimmer {self._node.address}"
+        self._attr_name = custom_name or f"VeloDimmer {self._node.address}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{self._node.bus_id}-{self._node.address}")},
+            name=self._attr_name,
+            manufacturer=self._node.manufacturer,
+            model=self._node.model or "VeloDimmer-1",
+            sw_version=self._node.sw_version,
+            hw_version=self._node.hw_version,
+            suggested_area=self._node.suggested_area,
+        )
 
     @property
     def supported_color_modes(self) -> set[ColorMode]:
@@ -277,37 +275,15 @@ class VeloDimmerEntity(LightEntity):
         """Return brightness."""
         return self._brightness if self._is_on else None
 
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        custom_name = self._storage.get_device_name(
-            self._node.bus_id, self._node.address
-        )
-
-        identifier = (DOMAIN, f"{self._node.bus_id}-{self._node.address}")
-
-        return DeviceInfo(
-            identifiers={identifier},
-            name=custom_name or f"VeloDimmer {self._node.address}",
-            manufacturer=self._node.manufacturer,
-            model=self._node.model or "VeloDimmer-1",
-            sw_version=self._node.sw_version,
-            hw_version=self._node.hw_version,
-            suggested_area=self._node.suggested_area,
-        )
-
     @property
     def extra_state_attributes(self) -> dict:
         """Return extra attributes."""
         last_encoder = (
-            self._last_encoder_time.isoformat() if self._last_encoder_time else None
+            dt_util.utc_from_timestamp(self._last_encoder_ts).isoformat()
+            if self._last_encoder_ts is not None
+            else None
         )
-        return {
-            "bus": self._node.bus_id,
-            "address": self._node.address,
-            "channel": self._ch,
-            "last_encoder": last_encoder,
-        }
+        return {**self._attrs_base, "last_encoder": last_encoder}
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn on light."""
@@ -317,62 +293,60 @@ class VeloDimmerEntity(LightEntity):
         if not self._is_on and ATTR_BRIGHTNESS not in kwargs:
             self._brightness = 255
 
-        await self._hub.async_set_pwm(
+        await self._set_pwm(
             self._node.bus_id, self._node.address, self._ch, self._brightness
         )
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn off light."""
-        await self._hub.async_set_pwm(
-            self._node.bus_id, self._node.address, self._ch, 0
-        )
+        await self._set_pwm(self._node.bus_id, self._node.address, self._ch, 0)
 
-    async def async_added_to_hass(self) -> None:
-        """Handle entity added."""
-
-        @callback
-        def _on_pwm_change(val: int) -> None:
-            self._brightness = max(1, min(255, val))
-            self._is_on = self._brightness > 0
-            self.async_write_ha_state()
+    @callback
+    def _push_pwm(self, val: int) -> None:
+        """Apply a PWM state from the hub."""
+        val = 0 if val < 0 else 255 if val > 255 else val
+        is_on = val > 0
+        # PWM 0 is off, the last non-zero brightness is kept for the next turn-on
+        brightness = val if is_on else self._brightness
+        if brightness == self._brightness and is_on == self._is_on:
+            return
+        self._brightness = brightness
+        self._is_on = is_on
+        self.async_write_ha_state()
 
-        self._unsub_pwm = self._hub.subscribe_pwm(
-            self._node.bus_id, self._node.address, self._ch, _on_pwm_change
+    @callback
+    def _push_button(self, pressed: bool) -> None:
+        """Toggle the light on a button press."""
+        if not pressed:
+            return
+        if self._is_on:
+            target = 0
+        else:
+            # Same as async_turn_on without a brightness
+            target = self._brightness = 255
+        self.hass.async_create_task(
+            self._set_pwm(self._node.bus_id, self._node.address, self._ch, target)
         )
 
-        @callback
-        def _on_button(pressed: bool) -> None:
-            if pressed:
-                if self._is_on:
-                    self.hass.async_create_task(self.async_turn_off())
-                else:
-                    self.hass.async_create_task(self.async_turn_on())
+    @callback
+    def _push_encoder(self, delta: int) -> None:
+        """Collect an encoder tick for the next coalesced write."""
+        self._last_encoder_ts = time.time()
+        self._pending_delta += delta
+        if self._flush_handle is None:
+            self._flush_handle = self.hass.loop.call_later(
+                _ENCODER_COALESCE_S, self._flush_encoder
+            )
 
+    async def async_added_to_hass(self) -> None:
+        """Handle entity added."""
+        bus_id, addr, ch = self._node.bus_id, self._node.address, self._ch
+        self._unsub_pwm = self._hub.subscribe_pwm(bus_id, addr, ch, self._push_pwm)
         self._unsub_button = self._hub.subscribe_button(
-            self._node.bus_id, self._node.address, self._ch, _on_button
+            bus_id, addr, ch, self._push_button
         )
-
-        @callback
-        def _on_encoder(delta: int) -> None:
-            self._last_encoder_time = dt_util.utcnow()
-
-            if not self._is_on:
-                self._brightness = 50
-                self.hass.async_create_task(self.async_turn_on())
-                return
-
-            new_brightness = self._brightness + (delta * 5)
-            new_brightness = max(1, min(255, new_brightness))
-
-            self._brightness = new_brightness
-            self.hass.async_create_task(
-                self._hub.async_set_pwm(
-                    self._node.bus_id, self._node.address, self._ch, new_brightness
-                )
-            )
-
         self._unsub_encoder = self._hub.subscribe_encoder(
-            self._node.bus_id, self._node.address, self._ch, _on_encoder
+            bus_id, addr, ch, self._push_encoder
         )
 
         @callback
@@ -381,14 +355,36 @@ class VeloDimmerEntity(LightEntity):
                 data["bus_id"] == self._node.bus_id
                 and data["address"] == self._node.address
             ):
+                self._refresh_names()
                 self.async_write_ha_state()
 
         self._unsub_name_update = async_dispatcher_connect(
             self._hass, signal_device_name_updated(self._entry_id), _on_name_update
         )
 
+    @callback
+    def _flush_encoder(self) -> None:
+        """Apply the encoder ticks collected since the first one in one write."""
+        self._flush_handle = None
+        delta, self._pending_delta = self._pending_delta, 0
+
+        if not self._is_on:
+            self._brightness = 50
+            self.hass.async_create_task(self.async_turn_on())
+            return
+
+        self._brightness = max(1, min(255, self._brightness + delta * 5))
+        self.hass.async_create_task(
+            self._set_pwm(
+                self._node.bus_id, self._node.address, self._ch, self._brightness
+            )
+        )
+
     async def async_will_remove_from_hass(self) -> None:
         """Handle entity removal."""
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
         if self._unsub_pwm:
             self._unsub_pwm()
         if self._unsub_button:
@@ -19,9 +19,9 @@ from .const import (
     DOMAIN,
     NODE_KIND_ANALOG,
     NODE_KIND_VELOSENSOR,
-    signal_new_node,
     signal_device_name_updated,
 )
+from .entity import async_entity_batcher
 from .hub import VelolinkHub, VelolinkNode
 from .storage import VelolinkStorage
 
@@ -29,6 +29,10 @@ _LOGGER = logging.getLogger(__name__)
 
 PARALLEL_UPDATES: Final[int] = 0
 
+_SENSOR_NODE_KINDS: Final[frozenset[str]] = frozenset(
+    (NODE_KIND_ANALOG, NODE_KIND_VELOSENSOR)
+)
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities
@@ -36,36 +40,34 @@ async def async_setup_entry(
     """Set up sensors."""
     hub: VelolinkHub = hass.data[DOMAIN][entry.entry_id]
     storage: VelolinkStorage = hass.data[DOMAIN][f"{entry.entry_id}_storage"]
-    created: set[str] = set()
+
+    add_entities, cancel_add = async_entity_batcher(hass, async_add_entities)
 
     @callback
     def _handle_new_node(node: VelolinkNode) -> None:
-        if node.kind not in (NODE_KIND_ANALOG, NODE_KIND_VELOSENSOR):
-            return
-
         entities = []
+        mask = node.spawned_sensor
         for ch in range(node.channels):
-            uid = f"{node.bus_id}-{node.address}-ain-{ch}"
-            if uid in created:
+            if mask & (1 << ch):
                 continue
-            created.add(uid)
+            mask |= 1 << ch
             entities.append(
                 VelolinkAnalogEntity(hass, entry.entry_id, hub, storage, node, ch)
             )
+        node.spawned_sensor = mask
+        add_entities(entities)
 
-        if entities:
-            async_add_entities(entities)
-
-    unsub = async_dispatcher_connect(
-        hass, signal_new_node(entry.entry_id), _handle_new_node
-    )
-    entry.async_on_unload(unsub)
+    entry.async_on_unload(cancel_add)
+    entry.async_on_unload(hub.register_platform(_SENSOR_NODE_KINDS, _handle_new_node))
 
 
 class VelolinkAnalogEntity(SensorEntity):
     """Sensor for Velolink analog input."""
 
     _attr_should_poll = False
+    _attr_native_unit_of_measurement = "V"
+    _attr_device_class = SensorDeviceClass.VOLTAGE
+    _attr_state_class = SensorStateClass.MEASUREMENT
 
     def __init__(
         self,
@@ -87,60 +89,24 @@ class VelolinkAnalogEntity(SensorEntity):
         self._unsub: Callable[[], None] | None = None
         self._unsub_name_update: Callable[[], None] | None = None
 
-    @property
-    def unique_id(self) -> str:
-        """Return unique ID."""
-        return f"{self._node.bus_id}-{self._node.address}-ain-{self._ch}"
+        self._attr_unique_id = f"{node.bus_id}-{node.address}-ain-{ch}"
+        self._refresh_names()
 
-    @property
-    def name(self) -> str:
-        """Return name."""
+    def _refresh_names(self) -> None:
+        """Cache name and device info, rebuilt only when the device is renamed."""
         custom_name = self._storage.get_device_name(
             self._node.bus_id, self._node.address
         )
         if custom_name:
-            return f"{custom_name} AIN {self._ch}"
-
-        if self._node.kind == NODE_KIND_VELOSENSOR:
-            return f"VeloSensor {self._node.address}:{self._ch}"
-
-        return f"Velolink AIN {self._node.address}:{self._ch}"
-
-    @property
-    def native_value(self) -> float | None:
-        """Return value."""
-        return self._value
-
-    @property
-    def native_unit_of_measurement(self) -> str | None:
-        """Return unit."""
-        return "V"
-
-    @property
-    def device_class(self) -> SensorDeviceClass | None:
-        """Return device class."""
-        return SensorDeviceClass.VOLTAGE
-
-    @property
-    def state_class(self) -> SensorStateClass | str | None:
-        """Return state class."""
-        return SensorStateClass.MEASUREMENT
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        custom_name = self._storage.get_device_name(
-            self._node.bus_id, self._node.address
-        )
-
-        identifier = (DOMAIN, f"{self._node.bus_id}-{self._node.address}")
-        device_name = (
-            custom_name or f"Velolink {self._node.kind.title()} {self._node.address}"
-        )
-
-        return DeviceInfo(
-            identifiers={identifier},
-            name=device_name,
+            self._attr_name = f"{custom_name} AIN {self._ch}"
+        elif self._node.kind == NODE_KIND_VELOSENSOR:
+            self._attr_name = f"VeloSensor {self._node.address}:{self._ch}"
+        else:
+            self._attr_name = f"Velolink AIN {self._node.address}:{self._ch}"
+
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{self._node.bus_id}-{self._node.address}")},
+            name=custom_name or self._node.display_name,
             manufacturer=self._node.manufacturer,
             model=self._node.model or "IO-ANALOG",
             sw_version=self._node.sw_version,
@@ -148,16 +114,24 @@ class VelolinkAnalogEntity(SensorEntity):
             suggested_area=self._node.suggested_area,
         )
 
-    async def async_added_to_hass(self) -> None:
-        """Handle entity added."""
+    @property
+    def native_value(self) -> float | None:
+        """Return value."""
+        return self._value
 
-        @callback
-        def _on_change(val: float) -> None:
-            self._value = val
-            self.async_write_ha_state()
+    @callback
+    def _push_analog(self, val: float) -> None:
+        """Apply an analog sample from the hub."""
+        # Samples are mV / 1000, an unchanged reading compares equal
+        if val == self._value:
+            return
+        self._value = val
+        self.async_write_ha_state()
 
+    async def async_added_to_hass(self) -> None:
+        """Handle entity added."""
         self._unsub = self._hub.subscribe_analog(
-            self._node.bus_id, self._node.address, self._ch, _on_change
+            self._node.bus_id, self._node.address, self._ch, self._push_analog
         )
 
         @callback
@@ -166,6 +140,7 @@ class VelolinkAnalogEntity(SensorEntity):
                 data["bus_id"] == self._node.bus_id
                 and data["address"] == self._node.address
             ):
+                self._refresh_names()
                 self.async_write_ha_state()
 
         self._unsub_name_update = async_dispatcher_connect(
@@ -3,15 +3,44 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict
+from dataclasses import asdict, dataclass, replace
+from typing import Any, Dict, Iterable, Tuple
 
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
 from homeassistant.helpers.storage import Store
 
-from .const import STORAGE_VERSION, STORAGE_KEY, POLARITY_NO
+from .const import STORAGE_VERSION, STORAGE_KEY, POLARITY_NO, signal_config_updated
 
 _LOGGER = logging.getLogger(__name__)
 
+SAVE_DELAY_S = 1.0
+
+
+@dataclass(frozen=True, slots=True)
+class ChannelCfg:
+    """Stored configuration of one channel."""
+
+    device_class: str = "none"
+    polarity: str = POLARITY_NO
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> ChannelCfg:
+        """Build from a stored entry, missing fields keep their defaults."""
+        return cls(
+            device_class=data.get("device_class", "none"),
+            polarity=data.get("polarity", POLARITY_NO),
+        )
+
+
+# Returned for channels that were never configured, frozen so safe to share
+_DEFAULT_CHANNEL_CONFIG = ChannelCfg()
+
+
+def channel_key(bus_id: str, addr: int, ch_type: str, ch: int) -> str:
+    """Return the storage key of a channel."""
+    return f"{bus_id}-{addr}-{ch_type}-{ch}"
+
 
 class VelolinkStorage:
     """Manage persistent storage for Velolink configuration."""
@@ -21,6 +50,13 @@ class VelolinkStorage:
         self._hass = hass
         self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
         self._data: Dict[str, Any] = {}
+        # Channels live here as ChannelCfg and are merged back into _data on save
+        self._channels: Dict[str, ChannelCfg] = {}
+        self._devices: Dict[str, Dict[str, Any]] = {}
+        # Custom names by (bus_id, addr), kept in step with _devices
+        self._names: Dict[Tuple[str, int], str] = {}
+        # Set while a scheduled save has not been written yet
+        self._dirty = False
         self._loaded = False
 
     async def async_load(self) -> None:
@@ -33,29 +69,58 @@ class VelolinkStorage:
             data = {"channels": {}, "devices": {}}
 
         self._data = data
+        self._channels = {
+            key: ChannelCfg.from_dict(cfg)
+            for key, cfg in data.get("channels", {}).items()
+        }
+        self._devices = data.setdefault("devices", {})
+        self._names = {}
+        for key, device in self._devices.items():
+            bus_id, _, addr = key.rpartition("-")
+            if "name" in device and addr.isdigit():
+                self._names[(bus_id, int(addr))] = device["name"]
         self._loaded = True
         _LOGGER.info(
             "Velolink storage loaded: %d channels, %d devices",
-            len(self._data.get("channels", {})),
-            len(self._data.get("devices", {})),
+            len(self._channels),
+            len(self._devices),
         )
 
     async def async_save(self) -> None:
         """Save data to storage."""
-        await self._store.async_save(self._data)
+        await self._store.async_save(self._data_to_save())
+
+    @callback
+    def async_schedule_save(self) -> None:
+        """Schedule a delayed save, bursts of updates collapse into one write."""
+        self._dirty = True
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY_S)
+
+    @callback
+    def _data_to_save(self) -> Dict[str, Any]:
+        """Return data to write, evaluated when the delayed save runs."""
+        self._dirty = False
+        return {
+            **self._data,
+            "channels": {key: asdict(cfg) for key, cfg in self._channels.items()},
+        }
+
+    async def async_flush(self) -> None:
+        """Write pending changes immediately, if there are any."""
+        if not self._dirty:
+            return
+        # Store.async_save also drops the pending delayed write
+        await self.async_save()
 
     def get_channel_config(
         self, bus_id: str, addr: int, ch_type: str, ch: int
-    ) -> Dict[str, Any]:
+    ) -> ChannelCfg:
         """Get channel configuration."""
-        key = f"{bus_id}-{addr}-{ch_type}-{ch}"
-        return self._data.get("channels", {}).get(
-            key,
-            {
-                "device_class": "none",
-                "polarity": POLARITY_NO,
-            },
-        )
+        return self.get_channel_config_by_key(channel_key(bus_id, addr, ch_type, ch))
+
+    def get_channel_config_by_key(self, key: str) -> ChannelCfg:
+        """Get channel configuration by a key built with channel_key."""
+        return self._channels.get(key, _DEFAULT_CHANNEL_CONFIG)
 
     async def async_set_channel_config(
         self,
@@ -65,34 +130,46 @@ class VelolinkStorage:
         ch: int,
         device_class: str | None = None,
         polarity: str | None = None,
+        dispatch_entry_id: str | None = None,
     ) -> None:
-        """Set channel configuration."""
+        """Set channel configuration, notifying the entry's entities if given."""
         # pylint: disable=too-many-arguments,too-many-positional-arguments
-        key = f"{bus_id}-{addr}-{ch_type}-{ch}"
-        if "channels" not in self._data:
-            self._data["channels"] = {}
-
-        cfg = self._data["channels"].setdefault(key, {})
-
+        key = channel_key(bus_id, addr, ch_type, ch)
+        changes = {}
         if device_class is not None:
-            cfg["device_class"] = device_class
+            changes["device_class"] = device_class
         if polarity is not None:
-            cfg["polarity"] = polarity
+            changes["polarity"] = polarity
+        cfg = self._channels[key] = replace(
+            self._channels.get(key, _DEFAULT_CHANNEL_CONFIG), **changes
+        )
 
-        await self.async_save()
+        if dispatch_entry_id is not None:
+            # Only the entities of the affected device are subscribed
+            async_dispatcher_send(
+                self._hass,
+                signal_config_updated(dispatch_entry_id, bus_id, addr),
+                ch,
+            )
+
+        self.async_schedule_save()
         _LOGGER.info("Updated channel %s: %s", key, cfg)
 
     def get_device_name(self, bus_id: str, addr: int) -> str | None:
         """Get custom device name."""
-        key = f"{bus_id}-{addr}"
-        return self._data.get("devices", {}).get(key, {}).get("name")
+        return self._names.get((bus_id, addr))
+
+    def get_device_names(
+        self, keys: Iterable[Tuple[str, int]]
+    ) -> Dict[Tuple[str, int], str | None]:
+        """Get custom device names for many (bus_id, addr) pairs at once."""
+        names = self._names
+        return {key: names.get(key) for key in keys}
 
     async def async_set_device_name(self, bus_id: str, addr: int, name: str) -> None:
         """Set custom device name."""
         key = f"{bus_id}-{addr}"
-        if "devices" not in self._data:
-            self._data["devices"] = {}
-
-        self._data["devices"].setdefault(key, {})["name"] = name
-        await self.async_save()
+        self._devices.setdefault(key, {})["name"] = name
+        self._names[(bus_id, addr)] = name
+        self.async_schedule_save()
         _LOGGER.info("Set device name for %s: %s", key, name)
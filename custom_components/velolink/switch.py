@@ -6,10 +6,7 @@ import logging
 from typing import Callable, Final
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.components.switch import (
-    SwitchEntity,
-    SwitchDeviceClass,
-)
+from homeassistant.components.switch import SwitchEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.helpers.entity import DeviceInfo
@@ -19,11 +16,12 @@ from .const import (
     NODE_KIND_OUTPUT,
     DEVICE_CLASS_OUTPUT_MAP,
     POLARITY_NC,
-    signal_new_node,
+    signal_config_updated,
     signal_device_name_updated,
 )
+from .entity import async_entity_batcher
 from .hub import VelolinkHub, VelolinkNode
-from .storage import VelolinkStorage
+from .storage import VelolinkStorage, channel_key
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -36,30 +34,25 @@ async def async_setup_entry(
     """Set up switches."""
     hub: VelolinkHub = hass.data[DOMAIN][entry.entry_id]
     storage: VelolinkStorage = hass.data[DOMAIN][f"{entry.entry_id}_storage"]
-    created: set[str] = set()
+
+    add_entities, cancel_add = async_entity_batcher(hass, async_add_entities)
 
     @callback
     def _handle_new_node(node: VelolinkNode) -> None:
-        if node.kind != NODE_KIND_OUTPUT:
-            return
-
         entities = []
+        mask = node.spawned_switch
         for ch in range(node.channels):
-            uid = f"{node.bus_id}-{node.address}-out-{ch}"
-            if uid in created:
+            if mask & (1 << ch):
                 continue
-            created.add(uid)
+            mask |= 1 << ch
             entities.append(
                 VelolinkOutputEntity(hass, entry.entry_id, hub, storage, node, ch)
             )
+        node.spawned_switch = mask
+        add_entities(entities)
 
-        if entities:
-            async_add_entities(entities)
-
-    unsub = async_dispatcher_connect(
-        hass, signal_new_node(entry.entry_id), _handle_new_node
-    )
-    entry.async_on_unload(unsub)
+    entry.async_on_unload(cancel_add)
+    entry.async_on_unload(hub.register_platform((NODE_KIND_OUTPUT,), _handle_new_node))
 
 
 class VelolinkOutputEntity(SwitchEntity):
@@ -85,62 +78,30 @@ class VelolinkOutputEntity(SwitchEntity):
         self._storage = storage
         self._node = node
         self._ch = ch
+        self._set_output = hub.async_set_output
         self._state = False
         self._unsub: Callable[[], None] | None = None
         self._unsub_name_update: Callable[[], None] | None = None
+        self._unsub_config_update: Callable[[], None] | None = None
 
+        self._attr_unique_id = f"{node.bus_id}-{node.address}-out-{ch}"
+        self._cfg_key = channel_key(node.bus_id, node.address, "out", ch)
+        self._refresh_names()
         self._load_config()
 
-    def _load_config(self) -> None:
-        """Load configuration."""
-        cfg = self._storage.get_channel_config(
-            self._node.bus_id, self._node.address, "out", self._ch
-        )
-        self._device_class_key = cfg.get("device_class", "none")
-        self._polarity = cfg.get("polarity", "NO")
-
-    @property
-    def unique_id(self) -> str:
-        """Return unique ID."""
-        return f"{self._node.bus_id}-{self._node.address}-out-{self._ch}"
-
-    @property
-    def name(self) -> str:
-        """Return name."""
+    def _refresh_names(self) -> None:
+        """Cache name and device info, rebuilt only when the device is renamed."""
         custom_name = self._storage.get_device_name(
             self._node.bus_id, self._node.address
         )
         if custom_name:
-            return f"{custom_name} OUT {self._ch}"
-        return f"Velolink OUT {self._node.address}:{self._ch}"
-
-    @property
-    def is_on(self) -> bool:
-        """Return state."""
-        if self._polarity == POLARITY_NC:
-            return not self._state
-        return self._state
+            self._attr_name = f"{custom_name} OUT {self._ch}"
+        else:
+            self._attr_name = f"Velolink OUT {self._node.address}:{self._ch}"
 
-    @property
-    def device_class(self) -> SwitchDeviceClass | None:
-        """Return device class."""
-        return DEVICE_CLASS_OUTPUT_MAP.get(self._device_class_key)
-
-    @property
-    def device_info(self) -> DeviceInfo:
-        """Return device info."""
-        custom_name = self._storage.get_device_name(
-            self._node.bus_id, self._node.address
-        )
-
-        identifier = (DOMAIN, f"{self._node.bus_id}-{self._node.address}")
-        device_name = (
-            custom_name or f"Velolink {self._node.kind.title()} {self._node.address}"
-        )
-
-        return DeviceInfo(
-            identifiers={identifier},
-            name=device_name,
+        self._attr_device_info = DeviceInfo(
+            identifiers={(DOMAIN, f"{self._node.bus_id}-{self._node.address}")},
+            name=custom_name or self._node.display_name,
             manufacturer=self._node.manufacturer,
             model=self._node.model or "IO-OUTPUT",
             sw_version=self._node.sw_version,
@@ -148,10 +109,15 @@ class VelolinkOutputEntity(SwitchEntity):
             suggested_area=self._node.suggested_area,
         )
 
-    @property
-    def extra_state_attributes(self) -> dict:
-        """Return extra attributes."""
-        return {
+    def _load_config(self) -> None:
+        """Load configuration."""
+        cfg = self._storage.get_channel_config_by_key(self._cfg_key)
+        self._device_class_key = cfg.device_class
+        self._polarity = cfg.polarity
+        self._invert = self._polarity == POLARITY_NC
+        self._attr_device_class = DEVICE_CLASS_OUTPUT_MAP.get(self._device_class_key)
+        # Only changes with the channel config, not per state write
+        self._attr_extra_state_attributes = {
             "bus": self._node.bus_id,
             "address": self._node.address,
             "channel": self._ch,
@@ -159,30 +125,35 @@ class VelolinkOutputEntity(SwitchEntity):
             "device_class_config": self._device_class_key,
         }
 
+    @property
+    def is_on(self) -> bool:
+        """Return state."""
+        return self._state ^ self._invert
+
     async def async_turn_on(self, **kwargs) -> None:
         """Turn on."""
-        physical_state = self._polarity != POLARITY_NC
-        await self._hub.async_set_output(
-            self._node.bus_id, self._node.address, self._ch, physical_state
+        await self._set_output(
+            self._node.bus_id, self._node.address, self._ch, not self._invert
         )
 
     async def async_turn_off(self, **kwargs) -> None:
         """Turn off."""
-        physical_state = self._polarity == POLARITY_NC
-        await self._hub.async_set_output(
-            self._node.bus_id, self._node.address, self._ch, physical_state
+        await self._set_output(
+            self._node.bus_id, self._node.address, self._ch, self._invert
         )
 
+    @callback
+    def _push_output(self, val: bool) -> None:
+        """Apply an output state from the hub."""
+        if val == self._state:
+            return
+        self._state = val
+        self.async_write_ha_state()
+
     async def async_added_to_hass(self) -> None:
         """Handle entity added."""
-
-        @callback
-        def _on_change(val: bool) -> None:
-            self._state = val
-            self.async_write_ha_state()
-
         self._unsub = self._hub.subscribe_output(
-            self._node.bus_id, self._node.address, self._ch, _on_change
+            self._node.bus_id, self._node.address, self._ch, self._push_output
         )
 
         @callback
@@ -191,12 +162,28 @@ class VelolinkOutputEntity(SwitchEntity):
                 data["bus_id"] == self._node.bus_id
                 and data["address"] == self._node.address
             ):
+                self._refresh_names()
                 self.async_write_ha_state()
 
         self._unsub_name_update = async_dispatcher_connect(
             self._hass, signal_device_name_updated(self._entry_id), _on_name_update
         )
 
+        @callback
+        def _on_config_update(ch: int | list[int]) -> None:
+            # Batch updates carry every changed channel of the device at once
+            if ch == self._ch or (isinstance(ch, list) and self._ch in ch):
+                self._load_config()
+                self.async_write_ha_state()
+
+        self._unsub_config_update = async_dispatcher_connect(
+            self._hass,
+            signal_config_updated(
+                self._entry_id, self._node.bus_id, self._node.address
+            ),
+            _on_config_update,
+        )
+
     async def async_will_remove_from_hass(self) -> None:
         """Handle entity removal."""
         if self._unsub:
@@ -205,3 +192,6 @@ class VelolinkOutputEntity(SwitchEntity):
         if self._unsub_name_update:
             self._unsub_name_update()
             self._unsub_name_update = None
+        if self._unsub_config_update:
+            self._unsub_config_update()
+            self._unsub_config_update = None
@@ -0,0 +1,667 @@
+"""Velolink RS485 framing and bus transports."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import struct
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Tuple
+
+from homeassistant.core import HomeAssistant
+
+from .const import (
+    DEFAULT_READ_BUFFER_SIZE,
+    DEFAULT_THREADED_WRITER,
+    GATEWAY_RECONNECT_DELAY_S,
+    FunctionCode,
+)
+
+try:
+    from fastcrc.crc16 import modbus as _crc16_native
+except ImportError:
+    _crc16_native = None
+
+_LOGGER = logging.getLogger(__name__)
+
+BusId = str
+
+# RS485 header: preamble (2), addr, func, seq, len
+FRAME_HDR = struct.Struct("<BBBBBB")
+U16 = struct.Struct("<H")
+
+
+def _build_crc16_table() -> array:
+    """Build the byte-wise lookup table for CRC16/Modbus (poly 0xA001)."""
+    table = array("H")
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+
+_CRC16_TABLE = _build_crc16_table()
+
+
+def _crc16_table(data: bytes, table: array = _CRC16_TABLE) -> int:
+    """Calculate CRC16/Modbus, one table lookup per byte."""
+    crc = 0xFFFF
+    for byte in data:
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
+    return crc
+
+
+# Native CRC when fastcrc happens to be installed, pure Python otherwise
+_crc16: Callable[[bytes], int] = _crc16_native or _crc16_table
+
+
+def build_frame(addr: int, func: int, payload: bytes) -> bytes:
+    """Build RS485 frame."""
+    frame = (
+        FRAME_HDR.pack(0xAA, 0x55, addr & 0xFF, func & 0xFF, 0, len(payload) & 0xFF)
+        + payload
+    )
+    # CRC covers everything after the preamble
+    return frame + U16.pack(_crc16(frame[2:]))
+
+
+@dataclass
+class VelolinkBusConfig:
+    """Bus configuration."""
+
+    port: str | None = None
+    host: str | None = None
+    tcp_port: int = 5485
+    baudrate: int = 115200
+    rts_toggle: bool = False
+    name: str = "RS485"
+    transport: str = "serial"
+    read_buffer_size: int = DEFAULT_READ_BUFFER_SIZE
+    # Serial only: write frames from a dedicated thread instead of the loop
+    threaded_writer: bool = DEFAULT_THREADED_WRITER
+
+
+_FRAME_PREAMBLE = b"\xaa\x55"
+# Drop consumed bytes from the RX buffer in bulk once this many have piled up
+_SERIAL_COMPACT_THRESHOLD = 4096
+
+
+def _frame_crc_ok(frame: bytes) -> bool:
+    """Return True if the RS485 frame CRC matches its body."""
+    return U16.unpack_from(frame, len(frame) - 2)[0] == _crc16(frame[2:-2])
+
+
+def _serial_write_all(port: Any, frame: bytes) -> None:
+    """Write a whole frame from the writer thread.
+
+    pyserial-asyncio opens the port with write_timeout=0, so write() is a single
+    non-blocking os.write that may accept only part of the frame.
+    """
+    view = memoryview(frame)
+    while view:
+        view = view[port.write(view) :]
+        if view:
+            # Kernel TX buffer is full, block this thread until it drains
+            port.flush()
+
+
+# ========== Serial Transport ==========
+class SerialTransport:
+    """Serial RS485 transport."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        bus_id: BusId,
+        cfg: VelolinkBusConfig,
+        frames_cb: Callable[[BusId, List[bytes]], None],
+    ) -> None:
+        """Initialize serial transport."""
+        self._hass = hass
+        self._bus_id = bus_id
+        self._cfg = cfg
+        self._frames_cb = frames_cb
+        self._serial_transport = None
+        self._serial_protocol = None
+        self._writer_lock = asyncio.Lock()
+        self._writer_pool: ThreadPoolExecutor | None = None
+
+    async def async_start(self) -> None:
+        """Start serial connection."""
+        # pylint: disable=import-outside-toplevel,import-error
+        import serial
+        import serial_asyncio
+
+        _LOGGER.info(
+            "Starting Serial %s on %s @ %d",
+            self._bus_id,
+            self._cfg.port,
+            self._cfg.baudrate,
+        )
+
+        loop = asyncio.get_running_loop()
+        rs485_settings = None
+
+        if self._cfg.rts_toggle:
+            try:
+                rs485_settings = serial.rs485.RS485Settings(
+                    rts_level_for_tx=True, rts_level_for_rx=False
+                )
+            except Exception:  # pylint: disable=broad-exception-caught
+                _LOGGER.warning("RS485Settings not supported")
+
+        self._serial_transport, self._serial_protocol = (
+            await serial_asyncio.create_serial_connection(
+                loop,
+                lambda: _SerialProtocol(self._hass, self._frames_cb, self._bus_id),
+                url=self._cfg.port,
+                baudrate=self._cfg.baudrate,
+                bytesize=serial.EIGHTBITS,
+                parity=serial.PARITY_NONE,
+                stopbits=serial.STOPBITS_ONE,
+                rs485_mode=rs485_settings,
+            )
+        )
+
+        if self._cfg.threaded_writer:
+            # One worker keeps frames in submission order
+            self._writer_pool = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=f"velolink_{self._bus_id}_tx"
+            )
+
+    async def async_stop(self) -> None:
+        """Stop serial connection."""
+        if self._writer_pool:
+            # Let a write in progress finish before the port is closed under it
+            await self._hass.async_add_executor_job(self._writer_pool.shutdown)
+            self._writer_pool = None
+        if self._serial_transport:
+            self._serial_transport.close()
+            self._serial_transport = None
+
+    async def async_write_frame(self, frame: bytes) -> None:
+        """Write frame to serial port."""
+        if not self._serial_transport:
+            raise RuntimeError("Serial not started")
+        if self._writer_pool:
+            # Written on the shared pyserial handle, reads stay on the loop
+            await asyncio.get_running_loop().run_in_executor(
+                self._writer_pool,
+                _serial_write_all,
+                self._serial_transport.serial,
+                frame,
+            )
+            return
+        async with self._writer_lock:
+            self._serial_transport.write(frame)
+            await asyncio.sleep(0)
+
+
+class _SerialProtocol(asyncio.Protocol):
+    """Serial protocol with frame extraction."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        frames_cb: Callable[[BusId, List[bytes]], None],
+        bus_id: BusId,
+    ) -> None:
+        """Initialize protocol."""
+        self._hass = hass
+        self.frames_cb = frames_cb
+        self.bus_id = bus_id
+        self.buffer = bytearray()
+        # Consumed bytes stay in the buffer until compaction, _pos marks the start
+        self._pos = 0
+
+    def data_received(self, data: bytes) -> None:
+        """Handle received data."""
+        self.buffer.extend(data)
+
+        # One loop wakeup per read, however many frames it completed
+        frames = []
+        while frame := self._extract_one_frame():
+            frames.append(frame)
+        if frames:
+            self._hass.loop.call_soon_threadsafe(self.frames_cb, self.bus_id, frames)
+
+        if self._pos >= len(self.buffer):
+            self.buffer.clear()
+            self._pos = 0
+        elif self._pos > _SERIAL_COMPACT_THRESHOLD:
+            del self.buffer[: self._pos]
+            self._pos = 0
+
+        if len(self.buffer) - self._pos > 512:
+            _LOGGER.warning("Bus %s: buffer overflow", self.bus_id)
+            self.buffer.clear()
+            self._pos = 0
+
+    def _extract_one_frame(self) -> Optional[bytes]:
+        """Extract one frame from buffer."""
+        buf = self.buffer
+        pos = self._pos
+
+        while len(buf) - pos >= 8:
+            # Resync in C instead of dropping stray bytes one at a time
+            start = buf.find(_FRAME_PREAMBLE, pos)
+            if start < 0:
+                # Keep a trailing 0xAA, it may be the first half of a preamble
+                pos = len(buf) - 1 if buf[-1] == _FRAME_PREAMBLE[0] else len(buf)
+                break
+            pos = start
+            if len(buf) - pos < 8:
+                break
+
+            total = 6 + buf[pos + 5] + 2
+            if len(buf) - pos < total:
+                break
+
+            # Single copy, slicing the bytearray first would copy twice
+            frame = memoryview(buf)[pos : pos + total].tobytes()
+            if not _frame_crc_ok(frame):
+                # False preamble or corrupted frame, resync past it
+                pos += 1
+                continue
+            self._pos = pos + total
+            return frame
+
+        self._pos = pos
+        return None
+
+
+# ========== TCP Transport ==========
+_TCP_MAGIC = b"VL"  # 0x56 0x4C
+_TCP_VERSION = 0x01
+# Packet header: magic, version, bus, RS485 frame length
+_TCP_HDR = struct.Struct("<2sBBH")
+
+
+class _TcpProtocol(asyncio.BufferedProtocol):
+    """VeloGateway protocol reading straight into a preallocated buffer."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        frames_cb: Callable[[BusId, List[bytes]], None],
+        bus_id: BusId,
+        buffer_size: int,
+    ) -> None:
+        """Initialize protocol."""
+        self._hass = hass
+        self._frames_cb = frames_cb
+        self._bus_id = bus_id
+        # A packet wraps one RS485 frame (max 263 bytes), keep room for several
+        self._buf = bytearray(max(buffer_size, 1024))
+        self._view = memoryview(self._buf)
+        self._read_pos = 0
+        self._write_pos = 0
+        self._closed: asyncio.Future[None] = hass.loop.create_future()
+        self._can_write = asyncio.Event()
+        self._can_write.set()
+
+    def get_buffer(self, sizehint: int) -> memoryview:
+        """Return the free tail of the receive buffer."""
+        if self._write_pos == len(self._buf):
+            # Move the unread part to the front; a full unread buffer is garbage
+            unread = self._write_pos - self._read_pos
+            if unread == len(self._buf):
+                _LOGGER.warning("TCP %s: buffer overflow", self._bus_id)
+                unread = 0
+            else:
+                # Copy first, source and destination may overlap
+                self._buf[:unread] = self._view[self._read_pos :].tobytes()
+            self._read_pos = 0
+            self._write_pos = unread
+        return self._view[self._write_pos :]
+
+    def buffer_updated(self, nbytes: int) -> None:
+        """Extract complete packets after new bytes landed in the buffer."""
+        self._write_pos += nbytes
+
+        buf = self._buf
+        pos = self._read_pos
+        end = self._write_pos
+        frames = []
+
+        while end - pos >= 8:
+            start = buf.find(_TCP_MAGIC, pos, end)
+            if start < 0:
+                # Keep a trailing 0x56, it may be the first half of the magic
+                pos = end - 1 if buf[end - 1] == _TCP_MAGIC[0] else end
+                break
+            pos = start
+            if end - pos < 8:
+                break
+
+            # Packet: [MAGIC(2)|VER(1)|BUS(1)|LEN(2)|RS485|CRC(2)]
+            (frame_len,) = U16.unpack_from(buf, pos + 4)
+            total_len = 6 + frame_len + 2
+            if total_len > len(buf):
+                # Cannot be a real packet, resync past this magic
+                pos += 1
+                continue
+            if end - pos < total_len:
+                break
+
+            frame = bytes(self._view[pos + 6 : pos + 6 + frame_len])
+            if frame_len < 8 or not _frame_crc_ok(frame):
+                # False magic or corrupted frame, resync past it
+                pos += 1
+                continue
+            frames.append(frame)
+            pos += total_len
+
+        if pos == end:
+            pos = self._write_pos = 0
+        self._read_pos = pos
+
+        # One loop wakeup per read, however many packets it completed
+        if frames:
+            self._hass.loop.call_soon_threadsafe(self._frames_cb, self._bus_id, frames)
+
+    def pause_writing(self) -> None:
+        """Stop writers while the transport buffer drains."""
+        self._can_write.clear()
+
+    def resume_writing(self) -> None:
+        """Let writers continue."""
+        self._can_write.set()
+
+    async def drain(self) -> None:
+        """Wait until the transport accepts more data."""
+        await self._can_write.wait()
+
+    def connection_lost(self, exc: Exception | None) -> None:
+        """Wake the read loop when the gateway goes away."""
+        self._can_write.set()
+        if not self._closed.done():
+            self._closed.set_result(None)
+
+    async def wait_closed(self) -> None:
+        """Wait until the connection is lost."""
+        await self._closed
+
+
+class TcpTransport:
+    """TCP transport for VeloGateway."""
+
+    # pylint: disable=too-many-instance-attributes
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        bus_id: BusId,
+        cfg: VelolinkBusConfig,
+        frames_cb: Callable[[BusId, List[bytes]], None],
+    ) -> None:
+        """Initialize TCP transport."""
+        self._hass = hass
+        self._bus_id = bus_id
+        self._cfg = cfg
+        self._frames_cb = frames_cb
+        self._bus_byte = 0x01 if bus_id == "bus1" else 0x02
+        self._transport: asyncio.Transport | None = None
+        self._protocol: _TcpProtocol | None = None
+        self._read_task: asyncio.Task | None = None
+        self._running = False
+        # Outgoing packets with the future their writer waits on
+        self._tx_queue: asyncio.Queue[Tuple[bytes, asyncio.Future[None]]] = (
+            asyncio.Queue()
+        )
+        self._tx_task: asyncio.Task | None = None
+
+    async def async_start(self) -> None:
+        """Start TCP connection."""
+        self._running = True
+        self._read_task = asyncio.create_task(self._reconnect_loop())
+        self._tx_task = asyncio.create_task(self._tx_pump())
+
+    async def async_stop(self) -> None:
+        """Stop TCP connection."""
+        self._running = False
+        if self._read_task:
+            self._read_task.cancel()
+        if self._tx_task:
+            self._tx_task.cancel()
+            self._tx_task = None
+        while not self._tx_queue.empty():
+            _packet, done = self._tx_queue.get_nowait()
+            done.cancel()
+        if self._transport:
+            self._transport.close()
+            self._transport = None
+
+    async def _reconnect_loop(self) -> None:
+        """Auto-reconnect loop."""
+        while self._running:
+            try:
+                await self._connect()
+                await self._read_loop()
+            except asyncio.CancelledError:
+                break
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                _LOGGER.warning(
+                    "TCP %s disconnected: %s, reconnecting in %ds",
+                    self._bus_id,
+                    err,
+                    GATEWAY_RECONNECT_DELAY_S,
+                )
+                await asyncio.sleep(GATEWAY_RECONNECT_DELAY_S)
+
+    async def _connect(self) -> None:
+        """Connect to gateway."""
+        _LOGGER.info(
+            "Connecting to VeloGateway %s:%d (bus=%s)",
+            self._cfg.host,
+            self._cfg.tcp_port,
+            self._bus_id,
+        )
+
+        loop = asyncio.get_running_loop()
+        self._transport, self._protocol = await loop.create_connection(
+            lambda: _TcpProtocol(
+                self._hass, self._frames_cb, self._bus_id, self._cfg.read_buffer_size
+            ),
+            self._cfg.host,
+            self._cfg.tcp_port,
+        )
+
+        _LOGGER.info("Connected to VeloGateway %s", self._bus_id)
+
+    async def _read_loop(self) -> None:
+        """Wait while the protocol receives packets, fail when it disconnects."""
+        await self._protocol.wait_closed()
+        self._transport = None
+        raise ConnectionError("TCP connection closed")
+
+    async def async_write_frame(self, frame: bytes) -> None:
+        """Write frame over TCP."""
+        if not self._transport:
+            raise RuntimeError("TCP not connected")
+
+        packet = (
+            _TCP_HDR.pack(_TCP_MAGIC, _TCP_VERSION, self._bus_byte, len(frame)) + frame
+        )
+        done: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._tx_queue.put_nowait((packet + U16.pack(_crc16(packet)), done))
+        await done
+
+    async def _tx_pump(self) -> None:
+        """Send queued packets, everything queued so far in one write."""
+        while True:
+            packet, done = await self._tx_queue.get()
+            packets = [packet]
+            waiters = [done]
+            while not self._tx_queue.empty():
+                packet, done = self._tx_queue.get_nowait()
+                packets.append(packet)
+                waiters.append(done)
+
+            try:
+                if not self._transport:
+                    raise RuntimeError("TCP not connected")
+                # Gathered by sendmsg on 3.12+, joined by the base class before
+                self._transport.writelines(packets)
+                await self._protocol.drain()
+            except asyncio.CancelledError:
+                for waiter in waiters:
+                    waiter.cancel()
+                raise
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_exception(err)
+            else:
+                for waiter in waiters:
+                    if not waiter.done():
+                        waiter.set_result(None)
+
+
+# ========== Demo Transport ==========
+class DemoTransport:
+    """Demo transport for testing without hardware."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        bus_id: BusId,
+        cfg: VelolinkBusConfig,
+        frame_cb: Callable[[BusId, bytes], None],
+    ) -> None:
+        """Initialize demo transport."""
+        self._hass = hass
+        self._bus_id = bus_id
+        self._frame_cb = frame_cb
+        self._running = False
+        self._simulator_task: asyncio.Task | None = None
+
+    async def async_start(self) -> None:
+        """Start demo simulation."""
+        _LOGGER.info("Starting Demo %s", self._bus_id)
+        self._running = True
+        self._simulator_task = asyncio.create_task(self._simulation_loop())
+
+    async def async_stop(self) -> None:
+        """Stop demo simulation."""
+        self._running = False
+        if self._simulator_task:
+            self._simulator_task.cancel()
+            try:
+                await self._simulator_task
+            except asyncio.CancelledError:
+                pass
+
+    async def async_write_frame(self, frame: bytes) -> None:
+        """Pretend to write a frame."""
+        func = frame[3]
+        _LOGGER.debug(
+            "Demo %s: Received command to send func=0x%02X", self._bus_id, func
+        )
+
+        if func == FunctionCode.SET_OUTPUT:
+            addr = frame[2]
+            ch = frame[6]
+            val = frame[7]
+            resp_payload = bytes([ch, val])
+            resp_frame = build_frame(
+                addr=addr, func=FunctionCode.OUTPUT_STATE, payload=resp_payload
+            )
+            self._hass.loop.call_soon_threadsafe(
+                self._frame_cb, self._bus_id, resp_frame
+            )
+        elif func == FunctionCode.SET_PWM:
+            addr = frame[2]
+            ch = frame[6]
+            val = frame[7]
+            resp_payload = bytes([ch, val])
+            resp_frame = build_frame(
+                addr=addr, func=FunctionCode.PWM_STATE, payload=resp_payload
+            )
+            self._hass.loop.call_soon_threadsafe(
+                self._frame_cb, self._bus_id, resp_frame
+            )
+
+    async def _simulation_loop(self) -> None:
+        """Main simulation loop."""
+        # FIX: Zwiększono opóźnienie, aby uniknąć race condition
+        _LOGGER.info(
+            "Demo %s: Simulation loop started, waiting before discovery...",
+            self._bus_id,
+        )
+        await asyncio.sleep(5)  # Zmieniono z 2 na 5 sekund
+        await self._simulate_discovery()
+        asyncio.create_task(self._simulate_input_changes())
+        asyncio.create_task(self._simulate_analog_changes())
+
+    async def _simulate_discovery(self):
+        """Simulate device discovery by sending HELLO frames."""
+        _LOGGER.info("Demo %s: Simulating device discovery", self._bus_id)
+        demo_devices = [
+            {"addr": 5, "kind": "input", "channels": 4, "model": "IO-INPUT-DEMO"},
+            {"addr": 10, "kind": "output", "channels": 2, "model": "IO-OUTPUT-DEMO"},
+            {"addr": 15, "kind": "pwm", "channels": 1, "model": "IO-PWM-DEMO"},
+            {"addr": 20, "kind": "analog", "channels": 1, "model": "IO-ANALOG-DEMO"},
+            {
+                "addr": 25,
+                "kind": "veloswitch",
+                "channels": 1,
+                "model": "VELOSWITCH-DEMO",
+            },
+        ]
+        for dev in demo_devices:
+            kind_map = {
+                "input": 0x00,
+                "output": 0x01,
+                "pwm": 0x02,
+                "analog": 0x03,
+                "veloswitch": 0x0A,
+            }
+            kind_code = kind_map.get(dev["kind"], 0xFF)
+            payload = bytes(
+                [kind_code, dev["channels"], 0x00, 1, 0, 1, 0, 1, len(dev["model"])]
+            ) + dev["model"].encode("ascii")
+            frame = build_frame(
+                addr=dev["addr"], func=FunctionCode.HELLO, payload=payload
+            )
+            # FIX: Dodano logowanie, aby śledzić wysyłane ramki
+            _LOGGER.info(
+                "Demo %s: Sending HELLO frame for device at address %d",
+                self._bus_id,
+                dev["addr"],
+            )
+            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
+            await asyncio.sleep(0.5)
+
+    async def _simulate_input_changes(self):
+        """Simulate binary sensor state changes."""
+        while self._running:
+            await asyncio.sleep(10)
+            payload = bytes([0, 1])
+            frame = build_frame(addr=5, func=FunctionCode.INPUT_CHANGE, payload=payload)
+            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
+            await asyncio.sleep(5)
+            payload = bytes([0, 0])
+            frame = build_frame(addr=5, func=FunctionCode.INPUT_CHANGE, payload=payload)
+            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
+
+    async def _simulate_analog_changes(self):
+        """Simulate analog sensor value changes."""
+        value = 1.0
+        while self._running:
+            await asyncio.sleep(5)
+            value += 0.1
+            if value > 3.3:
+                value = 1.0
+            val_mv = int(value * 1000)
+            payload = bytes([0, val_mv & 0xFF, (val_mv >> 8) & 0xFF])
+            frame = build_frame(
+                addr=20, func=FunctionCode.ANALOG_SAMPLE, payload=payload
+            )
+            self._hass.loop.call_soon_threadsafe(self._frame_cb, self._bus_id, frame)
@@ -0,0 +1,66 @@
+"""Tests for the Velolink channel config services."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# pylint: disable=wrong-import-position
+from custom_components.velolink import _async_set_channel_config
+from custom_components.velolink.const import (
+    ATTR_ADDRESS,
+    ATTR_BUS_ID,
+    ATTR_CHANNEL,
+    ATTR_CHANNEL_TYPE,
+    ATTR_DEVICE_CLASS,
+    ATTR_POLARITY,
+    DOMAIN,
+    NODE_KIND_OUTPUT,
+)
+from custom_components.velolink.hub import VelolinkHub, VelolinkNode
+from custom_components.velolink.transport import VelolinkBusConfig
+
+
+def _setup(node_kind: str | None = None):
+    """Return a hass mock with one loaded entry, its hub and its storage."""
+    hass = MagicMock()
+    hub = VelolinkHub(hass, "entry", {"bus1": VelolinkBusConfig()})
+    if node_kind is not None:
+        hub._register_node(  # pylint: disable=protected-access
+            VelolinkNode(bus_id="bus1", address=10, kind=node_kind, channels=2)
+        )
+    storage = MagicMock()
+    storage.async_set_channel_config = AsyncMock()
+    hass.data = {DOMAIN: {"entry": hub, "entry_storage": storage}}
+    return hass, storage
+
+
+def test_edit_out_channel_uses_out_key() -> None:
+    """An OUT channel picked in the options flow is stored under "out"."""
+    hass, storage = _setup()
+    data = {
+        ATTR_BUS_ID: "bus1",
+        ATTR_ADDRESS: 10,
+        ATTR_CHANNEL: 1,
+        ATTR_CHANNEL_TYPE: "out",
+        ATTR_DEVICE_CLASS: "outlet",
+        ATTR_POLARITY: "NC",
+    }
+
+    assert asyncio.run(_async_set_channel_config(hass, data)) == ["entry"]
+    storage.async_set_channel_config.assert_awaited_once_with(
+        "bus1", 10, "out", 1, "outlet", "NC", "entry"
+    )
+
+
+def test_channel_type_follows_node_kind() -> None:
+    """Without an explicit type, an output node's channel is stored as "out"."""
+    hass, storage = _setup(NODE_KIND_OUTPUT)
+    data = {ATTR_BUS_ID: "bus1", ATTR_ADDRESS: 10, ATTR_CHANNEL: 0}
+
+    asyncio.run(_async_set_channel_config(hass, data, dispatch=False))
+    storage.async_set_channel_config.assert_awaited_once_with(
+        "bus1", 10, "out", 0, None, None, None
+    )
@@ -0,0 +1,27 @@
+"""Tests for the Velolink storage."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# pylint: disable=wrong-import-position
+from custom_components.velolink import storage as storage_mod
+
+
+def test_flush_writes_only_pending_changes() -> None:
+    """Unloading without unsaved changes must not rewrite the shared store."""
+    with patch.object(storage_mod, "Store") as store_cls:
+        store = store_cls.return_value
+        store.async_save = AsyncMock()
+        storage = storage_mod.VelolinkStorage(MagicMock())
+
+        asyncio.run(storage.async_flush())
+        store.async_save.assert_not_awaited()
+
+        asyncio.run(storage.async_set_device_name("bus1", 5, "Salon"))
+        asyncio.run(storage.async_flush())
+        asyncio.run(storage.async_flush())
+        store.async_save.assert_awaited_once()
@@ -0,0 +1,55 @@
+"""Tests for the Velolink output switches."""
+
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# pylint: disable=wrong-import-position
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+
+from custom_components.velolink.const import POLARITY_NC, signal_config_updated
+from custom_components.velolink.hub import VelolinkHub, VelolinkNode
+from custom_components.velolink.storage import ChannelCfg
+from custom_components.velolink.switch import VelolinkOutputEntity
+from custom_components.velolink.transport import VelolinkBusConfig
+
+
+def test_output_config_update_applies_live(tmp_path) -> None:
+    """A config signal for the channel reloads polarity without a restart."""
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        hub = VelolinkHub(hass, "entry", {"bus1": VelolinkBusConfig()})
+        storage = MagicMock()
+        storage.get_device_name.return_value = None
+        storage.get_channel_config_by_key.return_value = ChannelCfg()
+        node = VelolinkNode(bus_id="bus1", address=10, kind="output", channels=2)
+
+        entity = VelolinkOutputEntity(hass, "entry", hub, storage, node, 1)
+        entity.hass = hass
+        entity.async_write_ha_state = MagicMock()
+        await entity.async_added_to_hass()
+        assert not entity.is_on
+
+        storage.get_channel_config_by_key.return_value = ChannelCfg(
+            device_class="outlet", polarity=POLARITY_NC
+        )
+        # Other channels of the device are ignored
+        async_dispatcher_send(hass, signal_config_updated("entry", "bus1", 10), 0)
+        await hass.async_block_till_done()
+        assert not entity.is_on
+
+        async_dispatcher_send(hass, signal_config_updated("entry", "bus1", 10), [0, 1])
+        await hass.async_block_till_done()
+        assert entity.is_on
+        assert entity.device_class == "outlet"
+        entity.async_write_ha_state.assert_called_once()
+
+        await entity.async_will_remove_from_hass()
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,249 @@
+"""Tests for the Velolink framing and transports."""
+
+import asyncio
+import random
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+pytest.importorskip("homeassistant")
+
+# pylint: disable=wrong-import-position
+from custom_components.velolink import transport as transport_mod
+
+
+def _crc16_bitwise(data: bytes) -> int:
+    """Reference CRC16/Modbus, one bit at a time."""
+    crc = 0xFFFF
+    for byte in data:
+        crc ^= byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0xA001 if crc & 1 else crc >> 1
+    return crc
+
+
+def _mock_hass() -> MagicMock:
+    """Return a hass stand-in whose loop runs threadsafe callbacks inline."""
+    hass = MagicMock()
+    hass.loop.call_soon_threadsafe.side_effect = lambda cb, *args: cb(*args)
+    return hass
+
+
+def _serial_protocol() -> tuple[transport_mod._SerialProtocol, list[bytes]]:
+    """Return a serial protocol and the list its frames are collected into."""
+    received: list[bytes] = []
+    protocol = transport_mod._SerialProtocol(
+        _mock_hass(), lambda _bus, frames: received.extend(frames), "bus1"
+    )
+    return protocol, received
+
+
+def test_crc16_table_matches_bitwise() -> None:
+    """The lookup table must compute the same CRC as the bitwise algorithm."""
+    assert transport_mod._crc16_table(b"123456789") == 0x4B37
+    rng = random.Random(0)
+    for length in (0, 1, 2, 7, 64, 263):
+        data = rng.randbytes(length)
+        expected = _crc16_bitwise(data)
+        assert transport_mod._crc16_table(data) == expected
+        assert transport_mod._crc16(data) == expected
+
+
+def test_serial_drops_frame_with_bad_crc() -> None:
+    """A corrupted frame is skipped and the next valid one still comes through."""
+    good = transport_mod.build_frame(5, 0x10, b"\x01\x02")
+    bad = bytearray(transport_mod.build_frame(6, 0x10, b"\x03\x04"))
+    bad[-1] ^= 0xFF
+
+    protocol, received = _serial_protocol()
+    protocol.data_received(bytes(bad) + good)
+
+    assert received == [good]
+
+
+def _chunks(data: bytes, rng: random.Random) -> list[bytes]:
+    """Split data at random points, as reads off a real port would."""
+    chunks = []
+    pos = 0
+    while pos < len(data):
+        size = rng.randint(1, 16)
+        chunks.append(data[pos : pos + size])
+        pos += size
+    return chunks
+
+
+def test_serial_resyncs_after_split_preamble() -> None:
+    """A preamble split across reads after garbage must not be lost."""
+    frame = transport_mod.build_frame(5, 0x10, b"\x01\x02")
+
+    protocol, received = _serial_protocol()
+    protocol.data_received(b"\x00\x13\x37\x55\x00\x01\x02\x03\xaa")
+    protocol.data_received(frame[1:])
+
+    assert received == [frame]
+
+
+def test_serial_resyncs_with_random_chunking() -> None:
+    """Frames between garbage and false preambles survive any read split."""
+    rng = random.Random(1)
+    frames = [
+        transport_mod.build_frame(addr, 0x10, bytes([addr, addr + 1]))
+        for addr in range(1, 21)
+    ]
+    stream = b"".join(
+        rng.choice((b"", b"\x00\xff", b"\xaa", b"\x55\xaa", b"\xaa\x55\x01")) + frame
+        for frame in frames
+    )
+
+    for _ in range(50):
+        protocol, received = _serial_protocol()
+        for chunk in _chunks(stream, rng):
+            protocol.data_received(chunk)
+        assert received == frames
+
+
+def _tcp_protocol(
+    buffer_size: int = 1024,
+) -> tuple[transport_mod._TcpProtocol, list[bytes]]:
+    """Return a gateway protocol and the list its frames are collected into."""
+    received: list[bytes] = []
+    protocol = transport_mod._TcpProtocol(
+        _mock_hass(), lambda _bus, frames: received.extend(frames), "bus1", buffer_size
+    )
+    return protocol, received
+
+
+def _tcp_packet(frame: bytes) -> bytes:
+    """Wrap an RS485 frame in a gateway packet."""
+    packet = transport_mod._TCP_HDR.pack(
+        transport_mod._TCP_MAGIC, transport_mod._TCP_VERSION, 0x01, len(frame)
+    )
+    packet += frame
+    return packet + transport_mod.U16.pack(transport_mod._crc16(packet))
+
+
+def _tcp_feed(protocol: transport_mod._TcpProtocol, data: bytes) -> None:
+    """Deliver data the way the event loop does, a buffer at a time."""
+    while data:
+        buf = protocol.get_buffer(-1)
+        nbytes = min(len(buf), len(data))
+        buf[:nbytes] = data[:nbytes]
+        protocol.buffer_updated(nbytes)
+        data = data[nbytes:]
+
+
+def test_tcp_resyncs_with_random_chunking() -> None:
+    """Packets between garbage and split magic survive any read split."""
+    rng = random.Random(2)
+    frames = [
+        transport_mod.build_frame(addr, 0x10, bytes([addr, addr + 1]))
+        for addr in range(1, 21)
+    ]
+    stream = b"".join(
+        rng.choice((b"", b"\x00\xff", b"V", b"LV", b"VL\xff\xff")) + _tcp_packet(frame)
+        for frame in frames
+    )
+
+    for _ in range(50):
+        protocol, received = _tcp_protocol()
+        for chunk in _chunks(stream, rng):
+            _tcp_feed(protocol, chunk)
+        assert received == frames
+
+
+def test_tcp_compacts_small_buffer() -> None:
+    """Packets straddling the end of a 1024 byte buffer are moved, not lost."""
+    rng = random.Random(3)
+    frames = [
+        transport_mod.build_frame(addr, 0x10, rng.randbytes(rng.randint(0, 255)))
+        for addr in range(1, 41)
+    ]
+    stream = b"".join(_tcp_packet(frame) for frame in frames)
+
+    protocol, received = _tcp_protocol(buffer_size=0)
+    for chunk in _chunks(stream, rng):
+        _tcp_feed(protocol, chunk)
+    assert len(protocol.get_buffer(-1).obj) == 1024
+    assert received == frames
+
+
+def test_tcp_recovers_from_full_buffer() -> None:
+    """A false header that never completes is dropped once it fills the buffer."""
+    frame = transport_mod.build_frame(5, 0x10, b"\x01\x02")
+    false_header = transport_mod._TCP_HDR.pack(b"VL", 0x01, 0x01, 1000)
+
+    protocol, received = _tcp_protocol()
+    _tcp_feed(protocol, false_header + bytes(1024 - len(false_header)))
+    _tcp_feed(protocol, _tcp_packet(frame))
+
+    assert received == [frame]
+
+
+def _tcp_transport() -> transport_mod.TcpTransport:
+    """Return a gateway transport with a mocked, connected socket."""
+    transport = transport_mod.TcpTransport(
+        _mock_hass(), "bus1", transport_mod.VelolinkBusConfig(), MagicMock()
+    )
+    transport._transport = MagicMock()
+    transport._protocol = MagicMock()
+    transport._protocol.drain = AsyncMock()
+    return transport
+
+
+def test_tx_pump_coalesces_writes() -> None:
+    """Frames queued together go out in one write and every writer returns."""
+
+    async def run() -> None:
+        transport = _tcp_transport()
+        transport._tx_task = asyncio.create_task(transport._tx_pump())
+        frames = [transport_mod.build_frame(addr, 0x20, b"\x00\x01") for addr in (1, 2)]
+
+        await asyncio.gather(*(transport.async_write_frame(f) for f in frames))
+
+        transport._transport.writelines.assert_called_once_with(
+            [_tcp_packet(frame) for frame in frames]
+        )
+        await transport.async_stop()
+
+    asyncio.run(run())
+
+
+def test_tx_pump_propagates_write_errors() -> None:
+    """A failed write raises in every writer whose frame was in the batch."""
+
+    async def run() -> None:
+        transport = _tcp_transport()
+        transport._transport.writelines.side_effect = OSError("broken pipe")
+        transport._tx_task = asyncio.create_task(transport._tx_pump())
+        frame = transport_mod.build_frame(1, 0x20, b"\x00\x01")
+
+        results = await asyncio.gather(
+            transport.async_write_frame(frame),
+            transport.async_write_frame(frame),
+            return_exceptions=True,
+        )
+
+        assert [type(result) for result in results] == [OSError, OSError]
+        assert not transport._tx_task.done()
+        await transport.async_stop()
+
+    asyncio.run(run())
+
+
+def test_tx_pump_cancels_writers_on_stop() -> None:
+    """Stopping mid-drain cancels writers instead of leaving them hanging."""
+
+    async def run() -> None:
+        transport = _tcp_transport()
+        transport._protocol.drain = AsyncMock(side_effect=asyncio.Event().wait)
+        transport._tx_task = asyncio.create_task(transport._tx_pump())
+        frame = transport_mod.build_frame(1, 0x20, b"\x00\x01")
+
+        writer = asyncio.create_task(transport.async_write_frame(frame))
+        await asyncio.sleep(0.01)
+        await transport.async_stop()
+
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(writer, 1)
+
+    asyncio.run(run())